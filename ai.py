@@ -1,24 +1,103 @@
 import numpy as np
 import random
 import math
+import time
+from threats import analyze
+from evaluators import HeuristicEvaluator
+from timecontrol import TimeManager
+from memory import MemoryBudget, evict_oldest
+
+# Transposition table entry flags
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# Cache keys keep the search depth in their low bits, below the position
+# key. Six bits hold any depth on a 6x7 board (at most 41 moves below a
+# root move), so keys of different positions never overlap.
+DEPTH_BITS = 6
+
+
+def cache_key(position, depth):
+    """Combine a position key and a search depth into one cache key
+    
+    Args:
+        position (int): Position key (Board.key or Board.canonical_key)
+        depth (int): Search depth, below 2 ** DEPTH_BITS
+    
+    Returns:
+        int: Key for AI.cache and AI.best_moves
+    """
+    return (position << DEPTH_BITS) | depth
+
+
+class SearchAborted(Exception):
+    """Raised inside a search when its stop callback asks it to quit"""
+
 
 class AI:
-    def __init__(self, board):
+    def __init__(self, board, cache=None, best_moves=None, algorithm='alphabeta',
+                 evaluator=None):
         """Initialize the AI
         
         Args:
             board: Board object representing the game state
+            cache (dict): Transposition table to share with another AI
+            best_moves (dict): Root search results (score, column) to share
+                with another AI
+            algorithm (str): Hard search algorithm, 'alphabeta' for plain
+                alpha-beta or 'pvs' for principal variation search with
+                aspiration windows; both choose the same move
+            evaluator: Leaf evaluator from evaluators.py (default: the
+                built-in heuristic); caches must only be shared between AIs
+                using the same evaluator
         """
         self.board = board
         self.PLAYER = 2  # AI is player 2
         self.OPPONENT = 1  # Human is player 1
+        self.SEARCH_DEPTH = 4
+        self.MAX_CACHE_ENTRIES = 500000
+        self.MAX_BEST_MOVES = None  # Unbounded unless a memory budget is set
+        self.algorithm = algorithm
+        self.ASPIRATION_WINDOW = 20
+        self.evaluator = HeuristicEvaluator() if evaluator is None else evaluator
+        
+        # PVS tries central columns first, so the first move is usually best
+        center = board.cols // 2
+        self.move_order = sorted(range(board.cols), key=lambda c: abs(c - center))
+        
+        # Search cache keyed by cache_key(position, depth): (flag, score) for
+        # inner nodes and the chosen column for finished root searches.
+        # With a symmetric evaluator, positions are stored once for both
+        # mirror images and only columns need to be flipped on the way out.
+        self.cache = {} if cache is None else cache
+        self.best_moves = {} if best_moves is None else best_moves
+        self.use_symmetry = self.evaluator.symmetric
+        self.should_stop = None
+        
+        # Optional AnalysisCache shared with other sessions and processes
+        self.analysis_cache = None
+        
+        # Splits the game clock into per-move budgets for timed games
+        self.time_manager = TimeManager()
+        
+        # Optional MemoryBudget capping the caches (see set_memory_budget)
+        self.memory_budget = None
+        
+        # Search statistics, for benchmarks
+        self.nodes = 0  # Positions visited by _minimax, and batched leaves
+        self.cache_probes = 0
+        self.cache_hits = 0
     
-    def get_best_move(self, difficulty):
+    def get_best_move(self, difficulty, time_left=None, increment=0.0):
         """Get the best move for the AI based on difficulty
         
         Args:
             difficulty (str): Difficulty level ('easy', 'medium', 'hard')
-            
+            time_left (float): Seconds left on the AI's game clock, or None
+                for untimed games; only the hard AI spends it
+            increment (float): Seconds added to the clock after each move
+        
         Returns:
             int: Column index for the best move
         """
@@ -31,15 +110,52 @@ class AI:
             return self._get_easy_move(valid_locations)
         elif difficulty == 'medium':
             return self._get_medium_move(valid_locations)
+        elif time_left is not None:
+            col = self._get_timed_move(valid_locations, time_left, increment)
         else:  # hard
-            return self._get_hard_move(valid_locations)
+            col = self._get_hard_move(valid_locations)
+        if self.memory_budget is not None:
+            self.memory_budget.apply(self)
+        return col
+    
+    def set_memory_budget(self, limit):
+        """Bound the memory of the AI's caches
+        
+        Caches shared with other AIs count against this AI's budget only.
+        
+        Args:
+            limit (int): Budget in bytes, or None to go back to the default
+                cache sizes
+        
+        Returns:
+            dict: Estimated bytes per structure after trimming, or None
+                without a budget (see MemoryBudget.report)
+        """
+        if limit is None:
+            self.memory_budget = None
+            self.MAX_CACHE_ENTRIES = 500000
+            self.MAX_BEST_MOVES = None
+            return None
+        self.memory_budget = MemoryBudget(limit)
+        return self.memory_budget.apply(self)
+    
+    def _remember(self, key, entry):
+        """Store a finished root search, evicting the oldest ones when full
+        
+        Args:
+            key (int): cache_key of the position and depth
+            entry (tuple): (score, column) in the key's orientation
+        """
+        if self.MAX_BEST_MOVES is not None and len(self.best_moves) >= self.MAX_BEST_MOVES:
+            evict_oldest(self.best_moves, max(1, len(self.best_moves) // 4))
+        self.best_moves[key] = entry
     
     def _get_easy_move(self, valid_locations):
         """Get a random move
         
         Args:
             valid_locations (list): List of valid column indices
-            
+        
         Returns:
             int: Column index for the move
         """
@@ -51,27 +167,19 @@ class AI:
         
         Args:
             valid_locations (list): List of valid column indices
-            
+        
         Returns:
             int: Column index for the move
         """
+        info = analyze(self.board)
+        
         # Check if AI can win in the next move
-        for col in valid_locations:
-            row = self.board.get_next_open_row(col)
-            temp_board = self.board.board.copy()
-            temp_board[row][col] = self.PLAYER
-            
-            if self._check_win_state(temp_board, self.PLAYER):
-                return col
+        if info.wins[self.PLAYER]:
+            return info.wins[self.PLAYER][0]
         
         # Check if opponent can win in the next move and block
-        for col in valid_locations:
-            row = self.board.get_next_open_row(col)
-            temp_board = self.board.board.copy()
-            temp_board[row][col] = self.OPPONENT
-            
-            if self._check_win_state(temp_board, self.OPPONENT):
-                return col
+        if info.wins[self.OPPONENT]:
+            return info.wins[self.OPPONENT][0]
         
         # Otherwise, choose randomly
         return random.choice(valid_locations)
@@ -81,57 +189,370 @@ class AI:
         
         Args:
             valid_locations (list): List of valid column indices
-            
+        
         Returns:
             int: Column index for the best move
         """
-        best_score = -math.inf
-        best_col = random.choice(valid_locations)
+        return self.search(self.board.copy(), valid_locations)
+    
+    def _get_timed_move(self, valid_locations, time_left, increment):
+        """Get the best move found within the time manager's budget
+        
+        Args:
+            valid_locations (list): List of valid column indices
+            time_left (float): Seconds left on the AI's clock
+            increment (float): Seconds added to the clock after the move
         
+        Returns:
+            int: Column index for the best move
+        """
+        start = time.perf_counter()
+        soft, hard = self.time_manager.allocate(time_left, increment, len(self.board.moves),
+                                                self.board.rows * self.board.cols)
+        return self.search_timed(self.board.copy(), start + soft, start + hard,
+                                 valid_locations)[1]
+    
+    def search(self, board, valid_locations=None):
+        """Search a position for the AI's best move, reusing earlier results
+        
+        Args:
+            board: Board object with the AI to move
+            valid_locations (list): List of valid column indices
+        
+        Returns:
+            int: Column index for the best move
+        """
+        return self.search_scored(board, valid_locations)[1]
+    
+    def search_scored(self, board, valid_locations=None):
+        """Search a position for the AI's best move and its score
+        
+        The search plays and takes back moves on the given board, so pass a
+        copy if another thread may look at it meanwhile.
+        
+        Args:
+            board: Board object with the AI to move
+            valid_locations (list): List of valid column indices
+        
+        Returns:
+            tuple: (score, column) of the best move, the score seen from
+                the AI's side
+        """
+        if valid_locations is None:
+            valid_locations = board.get_valid_locations()
+        
+        if self.use_symmetry:
+            position, mirrored = board.canonical_key()
+        else:
+            position, mirrored = board.key(), False
+        key = cache_key(position, self.SEARCH_DEPTH)
+        entry = self.best_moves.get(key)
+        if entry is None and self.analysis_cache is not None:
+            entry = self.analysis_cache.get(position, self.SEARCH_DEPTH,
+                                            self.evaluator.identity)
+            if entry is not None:
+                self._remember(key, entry)
+        if entry is not None:
+            score, best_col = entry
+            return score, board.mirror_col(best_col) if mirrored else best_col
+        
+        # No random draws here: the pondering thread runs this concurrently
+        # with the game, which must replay the same moves from its seed
+        info = analyze(board)
+        if info.wins[self.PLAYER]:
+            best_score, best_col = 100000, info.wins[self.PLAYER][0]
+        else:
+            valid_locations = info.safe_moves(self.PLAYER, valid_locations)
+            if self.algorithm == 'pvs':
+                best_score, best_col = self._aspiration_search(board, valid_locations)
+            else:
+                best_score, best_col = self._alphabeta_root(board, valid_locations,
+                                                            self.SEARCH_DEPTH)
+        
+        stored_col = board.mirror_col(best_col) if mirrored else best_col
+        self._remember(key, (best_score, stored_col))
+        if self.analysis_cache is not None:
+            self.analysis_cache.put(position, self.SEARCH_DEPTH, best_score, stored_col,
+                                    self.evaluator.identity)
+        return best_score, best_col
+    
+    def search_timed(self, board, soft_deadline, hard_deadline, valid_locations=None):
+        """Deepen the search of a position until a deadline
+        
+        Forced moves (an immediate win, or a single move that does not lose
+        on the spot) are played without searching, and so are cached
+        results at least time_manager.book_depth deep or reaching the end
+        of the game. Shallower cached results are reused as finished
+        iterations. No new depth is started after the soft deadline; a
+        search still running at the hard deadline is aborted and the
+        deepest finished iteration decides the move. Each finished depth is
+        cached like a search_scored result at that depth.
+        
+        Args:
+            board: Board object with the AI to move
+            soft_deadline (float): time.perf_counter() after which no
+                deeper iteration is started
+            hard_deadline (float): time.perf_counter() at which the search
+                is aborted
+            valid_locations (list): List of valid column indices
+        
+        Returns:
+            tuple: (score, column, depth) of the best move; depth is 0 and
+                the score None for forced moves played without a search
+        """
+        if valid_locations is None:
+            valid_locations = board.get_valid_locations()
+        
+        info = analyze(board)
+        if info.wins[self.PLAYER]:
+            return 100000, info.wins[self.PLAYER][0], 0
+        valid_locations = info.safe_moves(self.PLAYER, valid_locations)
+        if len(valid_locations) == 1:
+            return None, valid_locations[0], 0
+        
+        if self.use_symmetry:
+            position, mirrored = board.canonical_key()
+        else:
+            position, mirrored = board.key(), False
+        # Deeper than the cells left below the root move adds nothing
+        max_depth = board.rows * board.cols - len(board.moves) - 1
+        
+        # Start from the deepest cached result; without one, the central
+        # safe move is played if even depth 1 runs out of time
+        score = None
+        best_col = min(valid_locations, key=self.move_order.index)
+        first_depth = 1
+        for depth in range(max_depth, 0, -1):
+            entry = self.best_moves.get(cache_key(position, depth))
+            if entry is None and self.analysis_cache is not None:
+                entry = self.analysis_cache.get(position, depth, self.evaluator.identity)
+            if entry is not None:
+                score, best_col = entry
+                best_col = board.mirror_col(best_col) if mirrored else best_col
+                if (depth >= self.time_manager.book_depth or depth == max_depth or
+                        abs(score) >= 100000):
+                    return score, best_col, depth
+                first_depth = depth + 1
+                break
+        finished = first_depth - 1
+        
+        previous_stop = self.should_stop
+        self.should_stop = lambda: time.perf_counter() >= hard_deadline
+        try:
+            for depth in range(first_depth, max_depth + 1):
+                if depth > first_depth and time.perf_counter() >= soft_deadline:
+                    break
+                if self.algorithm == 'pvs':
+                    score, best_col = self._aspiration_iteration(board, valid_locations, depth,
+                                                                 score)
+                else:
+                    score, best_col = self._alphabeta_root(board, valid_locations, depth)
+                finished = depth
+                
+                stored_col = board.mirror_col(best_col) if mirrored else best_col
+                self._remember(cache_key(position, depth), (score, stored_col))
+                if self.analysis_cache is not None:
+                    self.analysis_cache.put(position, depth, score, stored_col,
+                                            self.evaluator.identity)
+                if abs(score) >= 100000:
+                    break
+        except SearchAborted:
+            pass
+        finally:
+            self.should_stop = previous_stop
+        return score, best_col, finished
+    
+    def _alphabeta_root(self, board, valid_locations, depth):
+        """Search every root move with a full window
+        
+        Args:
+            board: Board object with the AI to move
+            valid_locations (list): Root moves, in the order ties are broken
+            depth (int): Depth searched below each root move
+        
+        Returns:
+            tuple: (score, column) of the best move
+        """
+        best_score = -math.inf
+        best_col = None
         for col in valid_locations:
-            row = self.board.get_next_open_row(col)
-            temp_board = self.board.board.copy()
-            temp_board[row][col] = self.PLAYER
-            
-            score = self._minimax(temp_board, 4, False, -math.inf, math.inf)
+            board.play(col, self.PLAYER)
+            score = self._minimax(board, depth, False, -math.inf, math.inf)
+            board.undo()
             
             if score > best_score:
                 best_score = score
                 best_col = col
+        return best_score, best_col
+    
+    def _aspiration_search(self, board, valid_locations):
+        """Deepen the root search, each time in a narrow window around the
+        previous iteration's score
+        
+        Args:
+            board: Board object with the AI to move
+            valid_locations (list): Root moves, in the order ties are broken
+        
+        Returns:
+            tuple: (score, column) of the best move
+        """
+        score = None
+        for depth in range(1, self.SEARCH_DEPTH + 1):
+            score, best_col = self._aspiration_iteration(board, valid_locations, depth, score)
+        return score, best_col
+    
+    def _aspiration_iteration(self, board, valid_locations, depth, previous):
+        """Search the root at one depth in a window around the previous score
+        
+        Args:
+            board: Board object with the AI to move
+            valid_locations (list): Root moves, in the order ties are broken
+            depth (int): Depth searched below each root move
+            previous (int): Score of the previous iteration, or None
         
-        return best_col
+        Returns:
+            tuple: (score, column) of the best move
+        """
+        if previous is None or abs(previous) >= 100000:
+            alpha, beta = -math.inf, math.inf
+        else:
+            alpha = previous - self.ASPIRATION_WINDOW
+            beta = previous + self.ASPIRATION_WINDOW
+        score, best_col = self._search_root(board, valid_locations, depth, alpha, beta)
+        if score <= alpha or score >= beta:
+            # Outside the window the result is only a bound; search again
+            score, best_col = self._search_root(board, valid_locations, depth,
+                                                -math.inf, math.inf)
+        return score, best_col
+    
+    def _search_root(self, board, valid_locations, depth, alpha, beta):
+        """Principal variation search over the root moves
+        
+        Later moves only replace the best move when they score strictly
+        higher, so ties go to the earliest move just like in plain alpha-beta.
+        
+        Args:
+            board: Board object with the AI to move
+            valid_locations (list): Root moves
+            depth (int): Depth searched below each root move
+            alpha (float): Lower end of the search window
+            beta (float): Upper end of the search window
+        
+        Returns:
+            tuple: (score, column) of the best move; the score is exact only
+                if it lies strictly inside the window
+        """
+        best_score = -math.inf
+        best_col = None
+        for col in valid_locations:
+            board.play(col, self.PLAYER)
+            if best_col is None:
+                score = self._minimax(board, depth, False, alpha, beta)
+            else:
+                bound = max(alpha, best_score)
+                score = self._minimax(board, depth, False, bound, bound + 1)
+                if bound < score < beta:
+                    score = self._minimax(board, depth, False, bound, beta)
+            board.undo()
+            
+            if score > best_score:
+                best_score = score
+                best_col = col
+        return best_score, best_col
     
     def _minimax(self, board, depth, is_maximizing, alpha, beta):
         """Minimax algorithm with alpha-beta pruning
         
         Args:
-            board: Current board state
+            board: Board object, searched in place with play()/undo()
             depth (int): Current depth in the search tree
             is_maximizing (bool): True if maximizing player's turn
             alpha (float): Alpha value for pruning
             beta (float): Beta value for pruning
-            
+        
         Returns:
             float: Score for the current board state
         """
-        # Check terminal states
-        if self._check_win_state(board, self.PLAYER):
-            return 100000
-        elif self._check_win_state(board, self.OPPONENT):
-            return -100000
-        elif self._is_board_full(board) or depth == 0:
-            return self._evaluate_board(board)
+        self.nodes += 1
+        if self.should_stop is not None and self.should_stop():
+            raise SearchAborted()
+        
+        # Scores are exact minimax values or bounds, depending on the window
+        # the position was searched with
+        if self.use_symmetry:
+            key = (min(board.key(), board.mirror_key()) << DEPTH_BITS) | depth
+        else:
+            key = (board.key() << DEPTH_BITS) | depth
+        self.cache_probes += 1
+        entry = self.cache.get(key)
+        if entry is not None:
+            flag, score = entry
+            if (flag == EXACT or
+                    (flag == LOWER_BOUND and score >= beta) or
+                    (flag == UPPER_BOUND and score <= alpha)):
+                self.cache_hits += 1
+                return score
+        
+        value = self._minimax_search(board, depth, is_maximizing, alpha, beta)
+        
+        if value <= alpha:
+            flag = UPPER_BOUND
+        elif value >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        if len(self.cache) >= self.MAX_CACHE_ENTRIES:
+            self.cache.clear()
+        self.cache[key] = (flag, value)
+        return value
+    
+    def _minimax_search(self, board, depth, is_maximizing, alpha, beta):
+        """Search a position that is not in the cache (see _minimax)
         
-        valid_locations = self._get_valid_locations(board)
+        Args:
+            board: Board object, searched in place with play()/undo()
+            depth (int): Current depth in the search tree
+            is_maximizing (bool): True if maximizing player's turn
+            alpha (float): Alpha value for pruning
+            beta (float): Beta value for pruning
+        
+        Returns:
+            float: Score for the current board state
+        """
+        # Check terminal states; only the move that led here can have won
+        if board.last_move_won():
+            # The AI moved last exactly when it is now the opponent's turn
+            return -100000 if is_maximizing else 100000
+        elif board.is_full() or depth == 0:
+            return self._evaluate_board(board.board)
+        
+        # A player who can win on the spot does; below that, positions
+        # where the opponent has two wins that one move cannot both block
+        # (two winning columns, or two winning cells stacked in one column)
+        # are decided without searching them, which is exactly what the
+        # full search would find at depth >= 2
+        info = analyze(board)
+        player = self.PLAYER if is_maximizing else self.OPPONENT
+        if info.wins[player]:
+            return 100000 if is_maximizing else -100000
+        
+        valid_locations = board.get_valid_locations()
+        if depth >= 2:
+            if info.double_threat[3 - player]:
+                return -100000 if is_maximizing else 100000
+            valid_locations = info.safe_moves(player, valid_locations)
+        elif depth == 1 and self.evaluator.batched:
+            return self._evaluate_children(board, is_maximizing, valid_locations)
+        
+        if self.algorithm == 'pvs':
+            return self._pvs_children(board, depth, is_maximizing, alpha, beta, valid_locations)
         
         if is_maximizing:
             value = -math.inf
             for col in valid_locations:
-                row = self._get_next_open_row(board, col)
-                temp_board = board.copy()
-                temp_board[row][col] = self.PLAYER
-                
-                new_score = self._minimax(temp_board, depth-1, False, alpha, beta)
+                board.play(col, self.PLAYER)
+                new_score = self._minimax(board, depth-1, False, alpha, beta)
+                board.undo()
                 value = max(value, new_score)
                 alpha = max(alpha, value)
                 
@@ -141,11 +562,9 @@ class AI:
         else:
             value = math.inf
             for col in valid_locations:
-                row = self._get_next_open_row(board, col)
-                temp_board = board.copy()
-                temp_board[row][col] = self.OPPONENT
-                
-                new_score = self._minimax(temp_board, depth-1, True, alpha, beta)
+                board.play(col, self.OPPONENT)
+                new_score = self._minimax(board, depth-1, True, alpha, beta)
+                board.undo()
                 value = min(value, new_score)
                 beta = min(beta, value)
                 
@@ -153,74 +572,96 @@ class AI:
                     break
             return value
     
-    def _evaluate_board(self, board):
-        """Evaluate the board state
+    def _evaluate_children(self, board, is_maximizing, valid_locations):
+        """Score all children of a node one move above the leaves at once
+        
+        The player to move has no winning move here, so every child is a
+        leaf that goes to the evaluator. Scoring them in one batch costs
+        little more than scoring one, so the exact best child is returned
+        instead of cutting the loop off; that is a valid result for any
+        window.
         
         Args:
-            board: Current board state
-            
+            board: Board object, one move above the leaves
+            is_maximizing (bool): True if maximizing player's turn
+            valid_locations (list): Moves to score
+        
         Returns:
-            float: Score for the current board state
+            int: Score of the best child for the player to move
         """
-        score = 0
-        
-        # Score center column
-        center_array = board[:, 3]
-        center_count = np.count_nonzero(center_array == self.PLAYER)
-        score += center_count * 3
-        
-        # Score horizontal
-        for r in range(self.board.rows):
-            for c in range(self.board.cols - 3):
-                window = board[r, c:c+4]
-                score += self._evaluate_window(window)
+        player = self.PLAYER if is_maximizing else self.OPPONENT
+        children = np.repeat(board.board[np.newaxis], len(valid_locations), axis=0)
+        for i, col in enumerate(valid_locations):
+            children[i, board.get_next_open_row(col), col] = player
+        self.nodes += len(valid_locations)
+        scores = self.evaluator.evaluate_batch(children, self.PLAYER)
+        return int(scores.max() if is_maximizing else scores.min())
+    
+    def _pvs_children(self, board, depth, is_maximizing, alpha, beta, valid_locations):
+        """Search the children of a node with principal variation search
         
-        # Score vertical
-        for c in range(self.board.cols):
-            for r in range(self.board.rows - 3):
-                window = board[r:r+4, c]
-                score += self._evaluate_window(window)
+        The first child gets the full window. The others are only tested
+        against a null window and searched again when they turn out better.
+        Scores are integers, so a window of width 1 is a null window.
         
-        # Score positive diagonal
-        for r in range(self.board.rows - 3):
-            for c in range(self.board.cols - 3):
-                window = [board[r+i][c+i] for i in range(4)]
-                score += self._evaluate_window(window)
+        Args:
+            board: Board object, searched in place with play()/undo()
+            depth (int): Current depth in the search tree
+            is_maximizing (bool): True if maximizing player's turn
+            alpha (float): Alpha value for pruning
+            beta (float): Beta value for pruning
+            valid_locations (list): Moves to search
         
-        # Score negative diagonal
-        for r in range(3, self.board.rows):
-            for c in range(self.board.cols - 3):
-                window = [board[r-i][c+i] for i in range(4)]
-                score += self._evaluate_window(window)
+        Returns:
+            float: Score for the current board state
+        """
+        moves = [col for col in self.move_order if col in valid_locations]
         
-        return score
+        if is_maximizing:
+            value = -math.inf
+            for i, col in enumerate(moves):
+                board.play(col, self.PLAYER)
+                if i == 0:
+                    new_score = self._minimax(board, depth-1, False, alpha, beta)
+                else:
+                    new_score = self._minimax(board, depth-1, False, alpha, alpha + 1)
+                    if alpha < new_score < beta:
+                        new_score = self._minimax(board, depth-1, False, new_score, beta)
+                board.undo()
+                value = max(value, new_score)
+                alpha = max(alpha, value)
+                
+                if alpha >= beta:
+                    break
+            return value
+        else:
+            value = math.inf
+            for i, col in enumerate(moves):
+                board.play(col, self.OPPONENT)
+                if i == 0:
+                    new_score = self._minimax(board, depth-1, True, alpha, beta)
+                else:
+                    new_score = self._minimax(board, depth-1, True, beta - 1, beta)
+                    if alpha < new_score < beta:
+                        new_score = self._minimax(board, depth-1, True, alpha, new_score)
+                board.undo()
+                value = min(value, new_score)
+                beta = min(beta, value)
+                
+                if alpha >= beta:
+                    break
+            return value
     
-    def _evaluate_window(self, window):
-        """Evaluate a window of 4 positions
+    def _evaluate_board(self, board):
+        """Evaluate the board state with the AI's evaluator
         
         Args:
-            window: Array of 4 positions
-            
+            board: Current board state
+        
         Returns:
-            int: Score for the window
+            int: Score for the current board state
         """
-        score = 0
-        
-        player_count = np.count_nonzero(window == self.PLAYER)
-        opponent_count = np.count_nonzero(window == self.OPPONENT)
-        empty_count = np.count_nonzero(window == 0)
-        
-        if player_count == 4:
-            score += 100
-        elif player_count == 3 and empty_count == 1:
-            score += 5
-        elif player_count == 2 and empty_count == 2:
-            score += 2
-        
-        if opponent_count == 3 and empty_count == 1:
-            score -= 4
-        
-        return score
+        return self.evaluator.evaluate(board, self.PLAYER)
     
     def _check_win_state(self, board, player):
         """Check if the given player has won
@@ -228,7 +669,7 @@ class AI:
         Args:
             board: Current board state
             player (int): Player number to check for win
-            
+        
         Returns:
             bool: True if player has won, False otherwise
         """
@@ -275,7 +716,7 @@ class AI:
         
         Args:
             board: Current board state
-            
+        
         Returns:
             bool: True if the board is full, False otherwise
         """
@@ -286,7 +727,7 @@ class AI:
         
         Args:
             board: Current board state
-            
+        
         Returns:
             list: List of valid column indices
         """
@@ -302,7 +743,7 @@ class AI:
         Args:
             board: Current board state
             col (int): Column to check
-            
+        
         Returns:
             int: Row index of the next open position
         """
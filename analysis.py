@@ -0,0 +1,136 @@
+import math
+import threading
+
+from board import Board
+from ai import AI, SearchAborted
+
+
+class Analyzer:
+    def __init__(self, evaluator=None, max_depth=8, memory_budget=None):
+        """Initialize the background analysis of every column of a position
+        
+        Scores are refined one depth at a time and published column by
+        column as soon as each is searched, so the UI always has the latest
+        scores without waiting for the whole search. Every restart bumps a
+        generation counter; a search that sees a newer generation aborts on
+        its next node, so moving on to a new position is cheap.
+        
+        Args:
+            evaluator: Leaf evaluator for the searches (default: the
+                built-in heuristic)
+            max_depth (int): Deepest search, in moves including the column's
+            memory_budget (int): Bytes shared by the caches of both sides'
+                AIs, or None for the default cache sizes
+        """
+        self.max_depth = max_depth
+        # One AI per side to move: cached scores are relative to the AI's player
+        self.players = {}
+        for side in (1, 2):
+            ai = AI(Board(6, 7), evaluator=evaluator)
+            ai.PLAYER = side
+            ai.OPPONENT = 3 - side
+            if memory_budget is not None:
+                ai.set_memory_budget(memory_budget // 2)
+            self.players[side] = ai
+        
+        self.lock = threading.Lock()
+        self.thread = None
+        self.generation = 0
+        self.key = None  # Key of the analyzed position
+        self.scores = {}  # Column -> (score, depth) for the side to move
+        self.depth = 0  # Depth finished for every column
+        self.version = 0  # Bumped whenever the published results change
+    
+    def follow(self, board):
+        """Analyze the board's position unless it is already being analyzed
+        
+        Cheap enough to call every frame.
+        
+        Args:
+            board: Board object with the position to analyze
+        """
+        if board.key() != self.key:
+            self.start(board)
+    
+    def start(self, board):
+        """Restart the analysis on a new position
+        
+        Args:
+            board: Board object with the position to analyze (copied)
+        """
+        self.stop()
+        with self.lock:
+            self.key = board.key()
+            self.scores = {}
+            self.depth = 0
+            self.version += 1
+            generation = self.generation
+        self.thread = threading.Thread(target=self._analyze, args=(board.copy(), generation),
+                                       daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Abort the analysis and wait for the background search to exit"""
+        if self.thread is not None:
+            with self.lock:
+                self.generation += 1
+                self.key = None
+            self.thread.join()
+            self.thread = None
+    
+    def snapshot(self):
+        """Get the latest published results
+        
+        Returns:
+            tuple: (scores, depth, version) where scores maps columns to
+                (score, depth) from the side to move's point of view
+        """
+        with self.lock:
+            return dict(self.scores), self.depth, self.version
+    
+    def _publish(self, generation, col, score, depth):
+        """Store one column's score if the analysis is still current"""
+        with self.lock:
+            if generation == self.generation:
+                self.scores[col] = (score, depth)
+                self.version += 1
+    
+    def _analyze(self, board, generation):
+        """Deepen the search of every column until max_depth or cancellation
+        
+        Args:
+            board: Private copy of the position
+            generation (int): Generation this search belongs to
+        """
+        # Pieces on the board decide whose turn it is, even for loaded positions
+        side = 1 + bin(board.mask).count('1') % 2
+        ai = self.players[side]
+        ai.should_stop = lambda: self.generation != generation
+        
+        try:
+            for depth in range(self.max_depth):
+                decided = True
+                for col in ai.move_order:
+                    if not board.is_valid_move(col):
+                        continue
+                    board.play(col, side)
+                    if board.last_move_won():
+                        score = 100000
+                    else:
+                        score = ai._minimax(board, depth, False, -math.inf, math.inf)
+                    board.undo()
+                    decided = decided and abs(score) >= 100000
+                    self._publish(generation, col, score, depth + 1)
+                with self.lock:
+                    if generation != self.generation:
+                        return
+                    self.depth = depth + 1
+                    self.version += 1
+                # Re-measure the cache entries as the deeper searches fill them
+                if ai.memory_budget is not None:
+                    ai.memory_budget.apply(ai)
+                if decided:
+                    # Every column is a forced win or loss; deeper adds nothing
+                    return
+        except SearchAborted:
+            pass
@@ -0,0 +1,161 @@
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')),
+    'connect4-pygame', 'analysis.sqlite')
+
+
+class AnalysisCache:
+    def __init__(self, path=DEFAULT_PATH, max_entries=200000, batch_size=64):
+        """Initialize a persistent cache of finished root searches
+        
+        Entries map (evaluator identity, position key, depth) to the search
+        score and best move, as stored in AI.best_moves. The database is
+        only opened on first use. New entries and recency updates are
+        buffered and written in one transaction per batch; the least
+        recently used entries are evicted once the table grows past
+        max_entries. SQLite's WAL mode and busy timeout let several game
+        processes share one file.
+        
+        Args:
+            path (str): SQLite database file
+            max_entries (int): Entries kept after eviction
+            batch_size (int): Buffered writes that trigger a flush
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.connection = None
+        self.lock = threading.Lock()  # The pondering thread shares the cache
+        self.pending = {}  # (evaluator, key, depth) -> (score, best_move, last_used)
+        self.touched = {}  # (evaluator, key, depth) -> last_used, for entries read back
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def _connect(self):
+        """Open the database and create the table if needed"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=10.0,
+                                     isolation_level=None, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute('''CREATE TABLE IF NOT EXISTS results (
+                                  evaluator TEXT NOT NULL,
+                                  key INTEGER NOT NULL,
+                                  depth INTEGER NOT NULL,
+                                  score INTEGER NOT NULL,
+                                  best_move INTEGER NOT NULL,
+                                  last_used REAL NOT NULL,
+                                  PRIMARY KEY (evaluator, key, depth)
+                              ) WITHOUT ROWID''')
+        connection.execute('CREATE INDEX IF NOT EXISTS results_last_used '
+                           'ON results (last_used)')
+        self.connection = connection
+    
+    def get(self, key, depth, evaluator='heuristic'):
+        """Look up a finished search
+        
+        Args:
+            key (int): Position key, canonical for symmetric evaluators
+            depth (int): Search depth
+            evaluator (str): Identity of the evaluator the search used
+        
+        Returns:
+            tuple: (score, best_move), or None if the position is not cached
+        """
+        with self.lock:
+            entry = self.pending.get((evaluator, key, depth))
+            if entry is not None:
+                self.hits += 1
+                return entry[0], entry[1]
+            if self.connection is None:
+                self._connect()
+            row = self.connection.execute(
+                'SELECT score, best_move FROM results '
+                'WHERE evaluator = ? AND key = ? AND depth = ?',
+                (evaluator, key, depth)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.touched[(evaluator, key, depth)] = time.time()
+            self._maybe_flush()
+            return row
+    
+    def put(self, key, depth, score, best_move, evaluator='heuristic'):
+        """Store a finished search
+        
+        Args:
+            key (int): Position key, canonical for symmetric evaluators
+            depth (int): Search depth
+            score (int): Score of the best move
+            best_move (int): Best column, in the orientation of the key
+            evaluator (str): Identity of the evaluator the search used
+        """
+        with self.lock:
+            self.pending[(evaluator, key, depth)] = (int(score), best_move, time.time())
+            self._maybe_flush()
+    
+    def _maybe_flush(self):
+        """Flush once enough writes are buffered (lock must be held)"""
+        if len(self.pending) + len(self.touched) >= self.batch_size:
+            try:
+                self._flush()
+            except sqlite3.OperationalError:
+                # Another process held the write lock past the timeout; keep
+                # the batch for the next flush unless it has grown too big
+                if len(self.pending) > 10 * self.batch_size:
+                    self.pending.clear()
+                    self.touched.clear()
+    
+    def flush(self):
+        """Write buffered entries and recency updates to disk"""
+        with self.lock:
+            self._flush()
+    
+    def _flush(self):
+        """Write buffered entries in one transaction (lock must be held)"""
+        if not self.pending and not self.touched:
+            return
+        if self.connection is None:
+            self._connect()
+        connection = self.connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.executemany(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)',
+                [(evaluator, key, depth, score, best_move, last_used)
+                 for (evaluator, key, depth), (score, best_move, last_used)
+                 in self.pending.items()])
+            connection.executemany(
+                'UPDATE results SET last_used = ? '
+                'WHERE evaluator = ? AND key = ? AND depth = ?',
+                [(last_used, evaluator, key, depth)
+                 for (evaluator, key, depth), last_used in self.touched.items()])
+            count = connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+            if count > self.max_entries:
+                connection.execute(
+                    'DELETE FROM results WHERE (evaluator, key, depth) IN '
+                    '(SELECT evaluator, key, depth FROM results ORDER BY last_used LIMIT ?)',
+                    (count - self.max_entries,))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        self.pending.clear()
+        self.touched.clear()
+    
+    def close(self):
+        """Flush buffered writes and close the database"""
+        with self.lock:
+            if self.connection is None and not self.pending:
+                return
+            self._flush()
+            self.connection.close()
+            self.connection = None
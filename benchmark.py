@@ -0,0 +1,729 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from board import Board
+from ai import AI, cache_key
+from threats import analyze
+from evaluators import HeuristicEvaluator, MLPEvaluator
+from memory import MemoryBudget
+from ponder import Ponderer
+
+BOARD_ROWS = 6
+BOARD_COLS = 7
+
+
+def make_corpus(count, seed=1, max_moves=20):
+    """Build a reproducible set of non-terminal positions with the AI to move
+    
+    Args:
+        count (int): Number of positions
+        seed (int): Random seed
+        max_moves (int): Longest random opening, in moves
+    
+    Returns:
+        list: Board objects, each with player 2 (the AI) to move
+    """
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = Board(BOARD_ROWS, BOARD_COLS)
+        # An odd number of moves leaves the AI (player 2) to move
+        moves = 2 * rng.randrange(max_moves // 2) + 1
+        for _ in range(moves):
+            board.play(rng.choice(board.get_valid_locations()))
+            if board.last_move_won() or board.is_full():
+                break
+        else:
+            positions.append(board)
+    return positions
+
+
+class DiscardingCache(dict):
+    """Transposition table that never stores an entry
+    
+    Lets a traced search show the memory of the search itself, which the
+    growth of a real table would otherwise hide.
+    """
+    
+    def __setitem__(self, key, value):
+        pass
+
+
+def trace_search(board, depth, cache=None):
+    """Run one hard-difficulty search under tracemalloc
+    
+    Args:
+        board: Board object with the AI to move
+        depth (int): Search depth below the root moves
+        cache (dict): Transposition table for the AI (default: a new one)
+    
+    Returns:
+        tuple: (nodes, peak bytes, bytes still allocated afterwards, blocks
+            still allocated afterwards)
+    """
+    ai = AI(board.copy(), cache)
+    ai.SEARCH_DEPTH = depth
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    ai.get_best_move('hard')
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    diff = after.compare_to(before, 'filename')
+    return (ai.nodes, peak, sum(stat.size_diff for stat in diff),
+            sum(stat.count_diff for stat in diff))
+
+
+def bench_search(positions, depth, trace_memory=False):
+    """Time hard-difficulty searches from scratch on each position
+    
+    With trace_memory each search is repeated under tracemalloc, once as
+    is and once with a transposition table that stores nothing. The first
+    gives the peak memory and the bytes and blocks the search leaves
+    allocated per node, which is mostly table growth. The second gives the
+    peak of the search alone, which the table would otherwise hide.
+    
+    Args:
+        positions (list): Board objects with the AI to move
+        depth (int): Search depth below the root moves
+        trace_memory (bool): Repeat each search under tracemalloc to
+            measure its memory (much slower)
+    
+    Returns:
+        dict: Totals for nodes, seconds, peak traced bytes, bytes and
+            blocks left allocated and the peak without a table
+    """
+    totals = {'nodes': 0, 'seconds': 0.0, 'peak': 0, 'retained': 0, 'blocks': 0,
+              'no_table_peak': 0}
+    print("%4s %10s %10s %12s %10s %8s %8s %12s"
+          % ('pos', 'nodes', 'ms', 'nodes/s', 'peak KiB', 'B/node', 'blk/node', 'no-TT KiB'))
+    for index, board in enumerate(positions):
+        ai = AI(board.copy())
+        ai.SEARCH_DEPTH = depth
+        start = time.perf_counter()
+        ai.get_best_move('hard')
+        elapsed = time.perf_counter() - start
+        
+        peak = retained = blocks = no_table_peak = 0
+        if trace_memory:
+            _, peak, retained, blocks = trace_search(board, depth)
+            _, no_table_peak, _, _ = trace_search(board, depth, DiscardingCache())
+        
+        totals['nodes'] += ai.nodes
+        totals['seconds'] += elapsed
+        totals['peak'] = max(totals['peak'], peak)
+        totals['retained'] += retained
+        totals['blocks'] += blocks
+        totals['no_table_peak'] = max(totals['no_table_peak'], no_table_peak)
+        print("%4d %10d %10.1f %12.0f %10.1f %8.1f %8.2f %12.1f"
+              % (index, ai.nodes, elapsed * 1000, ai.nodes / elapsed, peak / 1024,
+                 retained / ai.nodes, blocks / ai.nodes, no_table_peak / 1024))
+    print("total %9d %10.1f %12.0f %10.1f %8.1f %8.2f %12.1f"
+          % (totals['nodes'], totals['seconds'] * 1000,
+             totals['nodes'] / totals['seconds'], totals['peak'] / 1024,
+             totals['retained'] / totals['nodes'], totals['blocks'] / totals['nodes'],
+             totals['no_table_peak'] / 1024))
+    return totals
+
+
+def opening_positions(plies):
+    """Enumerate every position after the given number of opening moves
+    
+    Args:
+        plies (int): Number of moves played from the empty board (odd, so
+            the AI is to move)
+    
+    Returns:
+        list: Board objects in move order
+    """
+    positions = [Board(BOARD_ROWS, BOARD_COLS)]
+    for _ in range(plies):
+        children = []
+        for board in positions:
+            for col in board.get_valid_locations():
+                child = board.copy()
+                child.play(col)
+                children.append(child)
+        positions = children
+    return positions
+
+
+def bench_cache(plies, depth):
+    """Compare search cache use with and without mirror canonicalization
+    
+    One AI searches every opening position in turn, keeping its caches
+    between searches as it would over many games.
+    
+    Args:
+        plies (int): Opening length of the searched positions
+        depth (int): Search depth below the root moves
+    """
+    positions = opening_positions(plies)
+    print("%d opening positions after %d moves, depth %d" % (len(positions), plies, depth))
+    print("%-10s %10s %10s %10s %9s %10s" % ('mode', 'nodes', 'entries', 'probes', 'hit rate', 'seconds'))
+    for use_symmetry in (False, True):
+        ai = AI(Board(BOARD_ROWS, BOARD_COLS))
+        ai.SEARCH_DEPTH = depth
+        ai.use_symmetry = use_symmetry
+        start = time.perf_counter()
+        for board in positions:
+            ai.board = board.copy()
+            ai.get_best_move('hard')
+        elapsed = time.perf_counter() - start
+        hit_rate = ai.cache_hits / ai.cache_probes if ai.cache_probes else 0.0
+        print("%-10s %10d %10d %10d %8.1f%% %10.2f"
+              % ('mirror' if use_symmetry else 'plain', ai.nodes, len(ai.cache),
+                 ai.cache_probes, hit_rate * 100, elapsed))
+
+
+def check_cache_keys(depth=2):
+    """Check that cache entries of different positions never mix
+    
+    Every opening position after one and three moves is searched with one
+    shared AI, in canonical key order so that positions with close keys
+    follow each other, and each result must match a search from empty
+    caches. Each position then gets a timed search that may only go one
+    depth past its own cached result; it must not pick up a neighbour's
+    entry as a deep cached result.
+    
+    Args:
+        depth (int): Search depth below the root moves
+    
+    Returns:
+        int: Number of failures
+    """
+    boards = opening_positions(1) + opening_positions(3)
+    # Two columns only differing in move order have neighbouring keys
+    for column in ([1, 1, 2], [1, 2, 1]):
+        board = Board(BOARD_ROWS, BOARD_COLS)
+        for player in column:
+            board.play(0, player)
+        boards.append(board)
+    # One board per position: transpositions and mirror images would
+    # rightly reuse each other's results
+    unique = {board.canonical_key()[0]: board for board in boards}
+    positions = [unique[key] for key in sorted(unique)]
+    
+    failures = 0
+    max_depth = BOARD_ROWS * BOARD_COLS
+    keys = {cache_key(key, d) for key in unique for d in range(max_depth)}
+    if len(keys) != len(unique) * max_depth:
+        print("Cache keys collide: %d keys for %d positions x %d depths"
+              % (len(keys), len(unique), max_depth))
+        failures += 1
+    
+    shared = AI(Board(BOARD_ROWS, BOARD_COLS))
+    shared.SEARCH_DEPTH = depth
+    for board in positions:
+        fresh = AI(Board(BOARD_ROWS, BOARD_COLS))
+        fresh.SEARCH_DEPTH = depth
+        expected = fresh.search_scored(board.copy())
+        found = shared.search_scored(board.copy())
+        if found != expected:
+            print("moves %s: search %s, %s from empty caches" % (board.moves, found, expected))
+            failures += 1
+    
+    for board in positions:
+        # A soft deadline that has passed stops the search after one depth
+        fresh = AI(Board(BOARD_ROWS, BOARD_COLS))
+        fresh.SEARCH_DEPTH = depth
+        fresh.search_scored(board.copy())
+        now = time.perf_counter()
+        expected = fresh.search_timed(board.copy(), now, now + 60)
+        found = shared.search_timed(board.copy(), now, now + 60)
+        if found != expected:
+            print("moves %s: timed search %s, %s from empty caches"
+                  % (board.moves, found, expected))
+            failures += 1
+    print("%d positions, %d failures" % (len(positions), failures))
+    return failures
+
+
+def stacked_threat_board():
+    """Build a position where player 1 has two winning cells in one column
+    
+    Player 1 has three in a row on the bottom two rows, so column 3 wins
+    for it at both heights; player 2 is to move and cannot win.
+    
+    Returns:
+        Board: The position
+    """
+    board = Board(BOARD_ROWS, BOARD_COLS)
+    for col, player in ((0, 1), (4, 2), (1, 1), (5, 2), (6, 1), (4, 2), (0, 1), (5, 2),
+                        (1, 1), (6, 2), (2, 1), (6, 2), (2, 1)):
+        board.play(col, player)
+    return board
+
+
+def check_threats(positions, depth=4):
+    """Check that double threats are forced wins and prune the search
+    
+    Every double threat found by the threat analysis, in a stacked threat
+    position and in the corpus, must leave the player to move only moves
+    after which the opponent wins on the spot. In the stacked threat
+    position the search must score the loss at every depth from 2 without
+    visiting any move.
+    
+    Args:
+        positions (list): Board objects with the AI to move
+        depth (int): Deepest search of the stacked threat position
+    
+    Returns:
+        int: Number of failures
+    """
+    failures = 0
+    board = stacked_threat_board()
+    info = analyze(board)
+    if not info.double_threat[1] or len(info.wins[1]) != 1 or info.wins[2]:
+        print("Stacked threat position: wins %s, double threats %s"
+              % (info.wins[1:], info.double_threat[1:]))
+        failures += 1
+    for d in range(2, depth + 1):
+        ai = AI(board.copy())
+        score = ai._minimax(ai.board, d, True, -math.inf, math.inf)
+        if score != -100000 or ai.nodes != 1:
+            print("Stacked threat position: depth %d search scores %s in %d nodes"
+                  % (d, score, ai.nodes))
+            failures += 1
+    
+    checked = 0
+    for position in [board] + positions:
+        info = analyze(position)
+        player = 1 + len(position.moves) % 2
+        if info.wins[player] or not info.double_threat[3 - player]:
+            continue
+        checked += 1
+        for col in position.get_valid_locations():
+            position.play(col, player)
+            if not analyze(position).wins[3 - player]:
+                print("moves %s: %d survives a double threat" % (position.moves[:-1], col))
+                failures += 1
+            position.undo()
+    print("%d double threats checked, %d failures" % (checked, failures))
+    return failures
+
+
+def bench_algorithms(positions, depth):
+    """Compare plain alpha-beta and PVS node counts at equal depth
+    
+    Both searches start from empty caches on every position and must pick
+    the same move; any position where they do not is reported.
+    
+    Args:
+        positions (list): Board objects with the AI to move
+        depth (int): Search depth below the root moves
+    
+    Returns:
+        int: Number of positions where the chosen moves differ
+    """
+    algorithms = ('alphabeta', 'pvs')
+    nodes = dict.fromkeys(algorithms, 0)
+    seconds = dict.fromkeys(algorithms, 0.0)
+    mismatches = 0
+    print("%4s %12s %12s %6s" % ('pos', 'alphabeta', 'pvs', 'move'))
+    for index, board in enumerate(positions):
+        moves = {}
+        for algorithm in algorithms:
+            ai = AI(board.copy(), algorithm=algorithm)
+            ai.SEARCH_DEPTH = depth
+            start = time.perf_counter()
+            moves[algorithm] = ai.get_best_move('hard')
+            seconds[algorithm] += time.perf_counter() - start
+            nodes[algorithm] += ai.nodes
+            moves[algorithm + '_nodes'] = ai.nodes
+        same = moves['alphabeta'] == moves['pvs']
+        mismatches += not same
+        print("%4d %12d %12d %6s" % (index, moves['alphabeta_nodes'], moves['pvs_nodes'],
+                                     moves['pvs'] if same else 'DIFF'))
+    for algorithm in algorithms:
+        print("%-10s %10d nodes %8.2f s" % (algorithm, nodes[algorithm], seconds[algorithm]))
+    print("Move mismatches: %d" % mismatches)
+    return mismatches
+
+
+def bench_medium(positions, repeat=200):
+    """Time medium-difficulty moves, which only use the threat analysis
+    
+    Args:
+        positions (list): Board objects with the AI to move
+        repeat (int): Moves timed per position
+    """
+    calls = 0
+    start = time.perf_counter()
+    for board in positions:
+        ai = AI(board.copy())
+        for _ in range(repeat):
+            ai.get_best_move('medium')
+        calls += repeat
+    elapsed = time.perf_counter() - start
+    print("Medium move: %d calls, %.1f us per move" % (calls, elapsed / calls * 1e6))
+
+
+def bench_ponder(positions, depth, think=0.3, moves=6, seed=1):
+    """Compare hard move latency with and without pondering
+    
+    From each position the AI plays against a simulated human who picks
+    random replies. With pondering, the AI searches in the background for
+    think seconds before each reply. The human's random choices are seeded
+    per game, so both runs play the same games.
+    
+    Args:
+        positions (list): Board objects with the AI to move
+        depth (int): Search depth below the root moves
+        think (float): Seconds the human thinks before each reply
+        moves (int): Most AI moves per game
+        seed (int): Random seed of the human's replies
+    
+    Returns:
+        dict: 'off' and 'on' to the list of move latencies in seconds, and
+            'hits' and 'misses' of the ponderer
+    """
+    results = {'hits': 0, 'misses': 0}
+    for ponder in (False, True):
+        latencies = []
+        for index, position in enumerate(positions):
+            rng = random.Random(seed + index)
+            board = position.copy()
+            ai = AI(board)
+            ai.SEARCH_DEPTH = depth
+            ponderer = Ponderer(ai) if ponder else None
+            for _ in range(moves):
+                start = time.perf_counter()
+                col = ai.get_best_move('hard')
+                latencies.append(time.perf_counter() - start)
+                board.play(col)
+                if board.last_move_won() or board.is_full():
+                    break
+                
+                if ponderer is not None:
+                    ponderer.start(board)
+                    time.sleep(think)
+                    ponderer.stop()
+                board.play(rng.choice(board.get_valid_locations()))
+                if board.last_move_won() or board.is_full():
+                    break
+                if ponderer is not None:
+                    ponderer.record_move(board)
+            if ponderer is not None:
+                results['hits'] += ponderer.hits
+                results['misses'] += ponderer.misses
+        results['on' if ponder else 'off'] = latencies
+    
+    print("%-8s %7s %10s %10s %10s" % ('ponder', 'moves', 'mean ms', 'p50 ms', 'max ms'))
+    for mode in ('off', 'on'):
+        latencies = sorted(results[mode])
+        print("%-8s %7d %10.1f %10.1f %10.1f"
+              % (mode, len(latencies), sum(latencies) / len(latencies) * 1000,
+                 latencies[len(latencies) // 2] * 1000, latencies[-1] * 1000))
+    replies = results['hits'] + results['misses']
+    print("Ponder hits: %d of %d replies (%.0f%%)"
+          % (results['hits'], replies, 100.0 * results['hits'] / replies if replies else 0.0))
+    return results
+
+
+def bench_evaluators(positions, depth, weights_path=None, network_path=None):
+    """Compare hard search speed with each evaluator, batched and one leaf
+    at a time
+    
+    Args:
+        positions (list): Board objects with the AI to move
+        depth (int): Search depth below the root moves
+        weights_path (str): JSON weights for the weights evaluator (default:
+            the built-in weights with diagonals scored)
+        network_path (str): .npz network for the mlp evaluator (default: an
+            untrained network of the same size)
+    """
+    evaluators = [
+        ('heuristic', HeuristicEvaluator()),
+        ('weights', HeuristicEvaluator.load(weights_path) if weights_path
+                    else HeuristicEvaluator({'diagonal': 1})),
+        ('mlp', MLPEvaluator.load(network_path) if network_path else MLPEvaluator.random()),
+    ]
+    print("%-22s %10s %10s %12s %12s" % ('evaluator', 'nodes', 'seconds', 'nodes/s', 'us/leaf'))
+    for name, evaluator in evaluators:
+        for batched in (True, False):
+            evaluator.batched = batched
+            nodes = 0
+            start = time.perf_counter()
+            for board in positions:
+                ai = AI(board.copy(), evaluator=evaluator)
+                ai.SEARCH_DEPTH = depth
+                ai.get_best_move('hard')
+                nodes += ai.nodes
+            elapsed = time.perf_counter() - start
+            
+            # Cost of one leaf, alone or in a batch of seven
+            cells = positions[0].board
+            leaves = cells[None].repeat(7, axis=0) if batched else cells
+            score = evaluator.evaluate_batch if batched else evaluator.evaluate
+            repeat = 200
+            leaf_start = time.perf_counter()
+            for _ in range(repeat):
+                score(leaves, 2)
+            per_leaf = (time.perf_counter() - leaf_start) / repeat / (7 if batched else 1)
+            
+            print("%-22s %10d %10.2f %12.0f %12.1f"
+                  % ('%s (%s)' % (name, 'batched' if batched else 'single'),
+                     nodes, elapsed, nodes / elapsed, per_leaf * 1e6))
+        del evaluator.batched
+
+
+def bench_memory(positions, depth, budgets):
+    """Compare search speed and memory use under several memory budgets
+    
+    One AI per budget searches every position in turn, keeping its caches
+    between searches as it would over many games. The structure sizes are
+    the budget's own accounting; the traced peak is measured by tracemalloc
+    on a second run and covers everything the searches allocated.
+    
+    Args:
+        positions (list): Board objects with the AI to move
+        depth (int): Search depth below the root moves
+        budgets (list): Budgets in bytes, None for the default cache sizes
+    """
+    def run(budget):
+        ai = AI(Board(BOARD_ROWS, BOARD_COLS))
+        ai.SEARCH_DEPTH = depth
+        ai.set_memory_budget(budget)
+        for board in positions:
+            ai.board = board.copy()
+            ai.get_best_move('hard')
+        return ai
+    
+    print("%d positions, depth %d; sizes in KiB" % (len(positions), depth))
+    print("%-9s %10s %8s %10s %9s %9s %9s %9s %10s"
+          % ('budget', 'nodes', 'seconds', 'nodes/s', 'entries', 'cache', 'best', 'eval',
+             'peak'))
+    for budget in budgets:
+        start = time.perf_counter()
+        ai = run(budget)
+        elapsed = time.perf_counter() - start
+        sizes = (ai.memory_budget or MemoryBudget(0)).report(ai)
+        
+        tracemalloc.start()
+        run(budget)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        if budget is None:
+            label = 'default'
+        elif budget < 2 ** 20:
+            label = '%d KiB' % (budget // 1024)
+        else:
+            label = '%.1f MiB' % (budget / 2 ** 20)
+        print("%-9s %10d %8.2f %10.0f %9d %9.0f %9.0f %9.0f %10.0f"
+              % (label, ai.nodes, elapsed,
+                 ai.nodes / elapsed, len(ai.cache), sizes['cache'] / 1024,
+                 sizes['best_moves'] / 1024, sizes['evaluator'] / 1024, peak / 1024))
+
+
+# Mouse positions replayed on every screen of the render suite: away from
+# everything, over each menu, settings and game over button, and over the
+# drop zone of several columns
+RENDER_MOUSE_POSITIONS = [
+    (0, 0), (350, 230), (350, 310), (350, 390), (350, 470),
+    (120, 275), (350, 275), (520, 275), (350, 430), (350, 660),
+    (110, 40), (350, 40), (590, 40), (350, 425), (350, 495),
+]
+
+
+def render_script(positions):
+    """Build the scripted frames of the render suite
+    
+    Args:
+        positions (list): Board objects shown on the game screens
+    
+    Returns:
+        list: (name, screen, state) tuples; screen is 'menu', 'settings',
+            'board' or 'game_over' and state holds the arguments it needs
+    """
+    script = [('menu', 'menu', None)]
+    for difficulty in ('easy', 'medium', 'hard'):
+        script.append(('settings/%s' % difficulty, 'settings', difficulty))
+    for index, board in enumerate(positions):
+        script.append(('board%d' % index, 'board', (board.board, 1 + len(board.moves) % 2)))
+    outcomes = [('red', (True, False, False)), ('yellow', (False, True, False)),
+                ('draw', (False, False, True))]
+    for name, outcome in outcomes:
+        script.append(('game_over/%s' % name, 'game_over', (positions[0].board, outcome)))
+    return script
+
+
+def bench_render(positions, repeat=20, save_path=None, compare_path=None):
+    """Time the UI draw calls off-screen and checksum the frames they draw
+    
+    Runs under SDL's dummy video driver, so no window is needed. Every
+    scripted screen is drawn at every mouse position in
+    RENDER_MOUSE_POSITIONS. Full draws start from an invalidated
+    compositor; repeated draws of an unchanged menu or settings screen show
+    the cost of a cached frame.
+    
+    Args:
+        positions (list): Board objects shown on the game screens
+        repeat (int): Times each frame is drawn
+        save_path (str): JSON file to write the frame checksums to
+        compare_path (str): JSON file of checksums the frames must match
+    
+    Returns:
+        int: Number of frames whose checksum differs from compare_path
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    # pygame is only needed by this suite
+    import pygame
+    from ui import UI
+    
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((700, 700))
+    ui = UI(screen, 700, 700)
+    mouse = [(0, 0)]
+    ui.get_mouse_pos = lambda: mouse[0]
+    
+    calls = {}  # Draw call name -> list of seconds
+    frames = {}  # Screen -> [full frame seconds, cached frame seconds]
+    checksums = {}
+    
+    def timed(name, function, *args):
+        start = time.perf_counter()
+        function(*args)
+        calls.setdefault(name, []).append(time.perf_counter() - start)
+    
+    def untimed(name, function, *args):
+        function(*args)
+    
+    def draw(screen_name, state, timed):
+        if screen_name == 'menu':
+            timed('draw_menu', ui.draw_menu)
+        elif screen_name == 'settings':
+            ui.set_difficulty(state)
+            timed('draw_settings', ui.draw_settings)
+        elif screen_name == 'board':
+            timed('draw_board', ui.draw_board, *state)
+        else:
+            cells, outcome = state
+            timed('draw_board', ui.draw_board, cells, 2)
+            timed('draw_game_over', ui.draw_game_over, *outcome)
+    
+    for name, screen_name, state in render_script(positions):
+        times = frames.setdefault(screen_name, [[], []])
+        for x, y in RENDER_MOUSE_POSITIONS:
+            mouse[0] = (x, y)
+            for _ in range(repeat):
+                ui.compositor.invalidate()
+                start = time.perf_counter()
+                draw(screen_name, state, timed)
+                ui.compositor.present()
+                times[0].append(time.perf_counter() - start)
+            checksums['%s@%d,%d' % (name, x, y)] = hashlib.sha1(
+                pygame.image.tostring(screen, 'RGB')).hexdigest()
+            if screen_name in ('menu', 'settings'):
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    draw(screen_name, state, untimed)
+                    ui.compositor.present()
+                    times[1].append(time.perf_counter() - start)
+    
+    print("%-16s %8s %10s %10s" % ('call', 'calls', 'mean us', 'max us'))
+    for name, samples in calls.items():
+        print("%-16s %8d %10.1f %10.1f" % (name, len(samples), sum(samples) / len(samples) * 1e6,
+                                           max(samples) * 1e6))
+    print("%-16s %8s %14s %14s" % ('screen', 'frames', 'full ms', 'cached ms'))
+    for screen_name, (full, cached) in frames.items():
+        cached_ms = '%14.3f' % (sum(cached) / len(cached) * 1000) if cached else '%14s' % '-'
+        print("%-16s %8d %14.3f %s" % (screen_name, len(full), sum(full) / len(full) * 1000,
+                                       cached_ms))
+    
+    mismatches = 0
+    if compare_path:
+        with open(compare_path) as f:
+            expected = json.load(f)
+        for key, checksum in checksums.items():
+            if expected.get(key) != checksum:
+                mismatches += 1
+                print("Pixel mismatch: %s" % key)
+        print("%d of %d frames differ from %s" % (mismatches, len(checksums), compare_path))
+    if save_path:
+        with open(save_path, 'w') as f:
+            json.dump(checksums, f, indent=2, sort_keys=True)
+        print("Saved %d frame checksums to %s" % (len(checksums), save_path))
+    pygame.quit()
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Connect 4 AI benchmarks")
+    parser.add_argument('suite', nargs='?', default='search',
+                        choices=['search', 'cache', 'medium', 'pvs', 'eval', 'render', 'memory',
+                                 'keys', 'ponder', 'threats'],
+                        help="search: nodes/s on random positions; "
+                             "cache: search cache hit rates in the opening; "
+                             "medium: medium move latency; "
+                             "pvs: alpha-beta vs PVS node counts and moves; "
+                             "eval: nodes/s per evaluator; "
+                             "memory: speed and memory use per memory budget; "
+                             "keys: check cache entries of different positions never mix; "
+                             "ponder: hard move latency and hit rate with and without pondering; "
+                             "threats: check double threats are forced wins; "
+                             "render: headless UI draw timings and frame checksums")
+    parser.add_argument('--positions', type=int, default=10)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="also measure peak memory and memory per node with tracemalloc")
+    parser.add_argument('--budgets', default='0,16,4,1',
+                        help="comma-separated MiB budgets for the memory suite, 0 for none")
+    parser.add_argument('--think', type=float, default=0.3,
+                        help="seconds the simulated human thinks in the ponder suite")
+    parser.add_argument('--plies', type=int, default=1,
+                        help="opening length for the cache suite")
+    parser.add_argument('--weights', default=None,
+                        help="JSON weights file for the eval suite")
+    parser.add_argument('--network', default=None,
+                        help=".npz network file for the eval suite")
+    parser.add_argument('--repeat', type=int, default=20,
+                        help="draws per frame for the render suite")
+    parser.add_argument('--save-checksums', default=None,
+                        help="write the render suite's frame checksums to a JSON file")
+    parser.add_argument('--checksums', default=None,
+                        help="compare render frames to saved checksums (exit 1 on mismatch)")
+    args = parser.parse_args()
+    
+    if args.suite == 'cache':
+        bench_cache(args.plies, args.depth)
+    elif args.suite == 'medium':
+        bench_medium(make_corpus(args.positions, args.seed))
+    elif args.suite == 'render':
+        mismatches = bench_render(make_corpus(args.positions, args.seed), args.repeat,
+                                  args.save_checksums, args.checksums)
+        sys.exit(1 if mismatches else 0)
+    elif args.suite == 'eval':
+        bench_evaluators(make_corpus(args.positions, args.seed), args.depth,
+                         args.weights, args.network)
+    elif args.suite == 'memory':
+        budgets = [int(float(mib) * 2 ** 20) or None for mib in args.budgets.split(',')]
+        bench_memory(make_corpus(args.positions, args.seed), args.depth, budgets)
+    elif args.suite == 'ponder':
+        bench_ponder(make_corpus(args.positions, args.seed), args.depth, args.think,
+                     seed=args.seed)
+    elif args.suite == 'threats':
+        sys.exit(1 if check_threats(make_corpus(args.positions, args.seed)) else 0)
+    elif args.suite == 'keys':
+        sys.exit(1 if check_cache_keys() else 0)
+    elif args.suite == 'pvs':
+        mismatches = bench_algorithms(make_corpus(args.positions, args.seed), args.depth)
+        sys.exit(1 if mismatches else 0)
+    else:
+        positions = make_corpus(args.positions, args.seed)
+        print("Hard search, depth %d, %d positions" % (args.depth, len(positions)))
+        bench_search(positions, args.depth, args.trace_memory)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,10 +11,69 @@ class Board:
         self.rows = rows
         self.cols = cols
         self.board = np.zeros((rows, cols), dtype=int)
+        self._reset_tracking()
+    
+    def _reset_tracking(self):
+        """Clear the move stack, column heights and bitboards"""
+        self.moves = []  # Columns played, most recent last
+        self.heights = [0] * self.cols  # Pieces in each column
+        
+        # One bit per cell, column by column from the bottom, with a spare
+        # bit on top of each column so line shifts never wrap around
+        self.bitboards = [0, 0, 0]  # Indexed by player (index 0 unused)
+        self.mask = 0  # All occupied cells
+        
+        # The same for the position mirrored left to right
+        self.mirror_player1 = 0
+        self.mirror_mask = 0
     
     def reset(self):
         """Reset the board to empty state"""
         self.board = np.zeros((self.rows, self.cols), dtype=int)
+        self._reset_tracking()
+    
+    def load(self, cells):
+        """Set up an arbitrary position
+        
+        The move stack starts empty, so undo() can only take back moves
+        played after loading.
+        
+        Args:
+            cells: 2D array or nested lists of player numbers (row 0 is the top)
+        """
+        self.board = np.array(cells, dtype=int)
+        self._reset_tracking()
+        for c in range(self.cols):
+            for r in range(self.rows):
+                player = int(self.board[r, c])
+                if player:
+                    height = self.rows - 1 - r
+                    bit = 1 << (c * (self.rows + 1) + height)
+                    self.bitboards[player] |= bit
+                    self.mask |= bit
+                    mirror_bit = 1 << ((self.cols - 1 - c) * (self.rows + 1) + height)
+                    if player == 1:
+                        self.mirror_player1 |= mirror_bit
+                    self.mirror_mask |= mirror_bit
+                    self.heights[c] = max(self.heights[c], height + 1)
+    
+    def copy(self):
+        """Create an independent copy of the board
+        
+        Returns:
+            Board: Board with the same position, move stack and heights
+        """
+        other = Board.__new__(Board)
+        other.rows = self.rows
+        other.cols = self.cols
+        other.board = self.board.copy()
+        other.moves = list(self.moves)
+        other.heights = list(self.heights)
+        other.bitboards = list(self.bitboards)
+        other.mask = self.mask
+        other.mirror_player1 = self.mirror_player1
+        other.mirror_mask = self.mirror_mask
+        return other
     
     def drop_piece(self, row, col, player):
         """Place a piece on the board
@@ -24,14 +83,130 @@ class Board:
             col (int): Column position
             player (int): Player number (1 or 2)
         """
-        self.board[row][col] = player
+        if row == self.get_next_open_row(col):
+            self.play(col, player)
+        else:
+            # Not a legal drop; rebuild the tracking state from the cells
+            self.board[row][col] = player
+            self.load(self.board)
+    
+    def play(self, col, player=None):
+        """Drop a piece into a column in place
+        
+        Args:
+            col (int): Column to play, which must not be full
+            player (int): Player number (default: the player whose turn it is
+                when player 1 moved first)
+        """
+        if player is None:
+            player = 1 + len(self.moves) % 2
+        height = self.heights[col]
+        self.board[self.rows - 1 - height, col] = player
+        bit = 1 << (col * (self.rows + 1) + height)
+        self.bitboards[player] |= bit
+        self.mask |= bit
+        mirror_bit = 1 << ((self.cols - 1 - col) * (self.rows + 1) + height)
+        if player == 1:
+            self.mirror_player1 |= mirror_bit
+        self.mirror_mask |= mirror_bit
+        self.heights[col] = height + 1
+        self.moves.append(col)
+    
+    def undo(self):
+        """Take back the most recent play()
+        
+        Returns:
+            int: Column of the move that was taken back
+        """
+        col = self.moves.pop()
+        height = self.heights[col] - 1
+        self.board[self.rows - 1 - height, col] = 0
+        bit = 1 << (col * (self.rows + 1) + height)
+        self.bitboards[1] &= ~bit
+        self.bitboards[2] &= ~bit
+        self.mask ^= bit
+        mirror_bit = 1 << ((self.cols - 1 - col) * (self.rows + 1) + height)
+        self.mirror_player1 &= ~mirror_bit
+        self.mirror_mask ^= mirror_bit
+        self.heights[col] = height
+        return col
+    
+    def key(self):
+        """Get a unique integer key for the current position
+        
+        Returns:
+            int: Key that differs for every distinct position
+        """
+        return self.bitboards[1] + self.mask
+    
+    def mirror_key(self):
+        """Get the key of the position mirrored left to right
+        
+        Returns:
+            int: Key of the mirrored position
+        """
+        return self.mirror_player1 + self.mirror_mask
+    
+    def canonical_key(self):
+        """Get a key shared by the position and its mirror image
+        
+        Returns:
+            tuple: (key, mirrored) where key is the smaller of key() and
+                mirror_key(), and mirrored is True if that is the mirror's key.
+                Columns stored under the key must be flipped with
+                mirror_col() when mirrored is True.
+        """
+        key = self.bitboards[1] + self.mask
+        mirror_key = self.mirror_player1 + self.mirror_mask
+        if mirror_key < key:
+            return mirror_key, True
+        return key, False
+    
+    def mirror_col(self, col):
+        """Map a column to its mirror image
+        
+        Args:
+            col (int): Column index
+        
+        Returns:
+            int: Column index after reflecting the board left to right
+        """
+        return self.cols - 1 - col
+    
+    def last_move_won(self):
+        """Check if the piece played last completed a line of four
+        
+        Returns:
+            bool: True if the player who moved last has won
+        """
+        col = self.moves[-1]
+        bit = 1 << (col * (self.rows + 1) + self.heights[col] - 1)
+        player = 1 if self.bitboards[1] & bit else 2
+        return self.is_aligned(self.bitboards[player])
+    
+    def is_aligned(self, bits):
+        """Check if a bitboard contains four in a row
+        
+        Args:
+            bits (int): Bitboard of one player's pieces
+        
+        Returns:
+            bool: True if the pieces contain a line of four
+        """
+        h = self.rows + 1
+        # Vertical, horizontal and both diagonals
+        for shift in (1, h, h - 1, h + 1):
+            pairs = bits & (bits >> shift)
+            if pairs & (pairs >> (2 * shift)):
+                return True
+        return False
     
     def is_valid_move(self, col):
         """Check if a move is valid
         
         Args:
             col (int): Column to check
-            
+        
         Returns:
             bool: True if the column has an empty space, False otherwise
         """
@@ -39,21 +214,21 @@ class Board:
         if col < 0 or col >= self.cols:
             return False
         
-        # Check if the top row of the column is empty
-        return self.board[0][col] == 0
+        # Check if the column has room left
+        return self.heights[col] < self.rows
     
     def get_next_open_row(self, col):
         """Find the next open row in the given column
         
         Args:
             col (int): Column to check
-            
+        
         Returns:
             int: Row index of the next open position
         """
-        for r in range(self.rows-1, -1, -1):
-            if self.board[r][col] == 0:
-                return r
+        height = self.heights[col]
+        if height < self.rows:
+            return self.rows - 1 - height
         return -1
     
     def is_full(self):
@@ -62,14 +237,14 @@ class Board:
         Returns:
             bool: True if the board is full, False otherwise
         """
-        return not any(self.board[0] == 0)
+        return min(self.heights) == self.rows
     
     def check_win(self, player):
         """Check if the given player has won
         
         Args:
             player (int): Player number to check for win
-            
+        
         Returns:
             bool: True if player has won, False otherwise
         """
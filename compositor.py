@@ -0,0 +1,81 @@
+import pygame
+
+
+class Compositor:
+    def __init__(self, screen):
+        """Initialize the compositor for a display surface
+        
+        Screens describe each frame with a key of everything that affects
+        its pixels (screen name, game state, hovered button). A frame whose
+        key matches the frame already on the screen is not drawn again.
+        Static parts of screens are drawn once into cached layers. The
+        display is updated once per frame, by present().
+        
+        Args:
+            screen: Pygame display surface
+        """
+        self.screen = screen
+        self.layers = {}
+        self.frame_key = None  # Key of the frame on the screen, None if unknown
+        self.redrawn = False  # The whole screen changed this frame
+        self.dirty_rects = []  # Smaller areas that changed this frame
+        
+        # Statistics, for the render benchmark
+        self.frames_drawn = 0
+        self.frames_skipped = 0
+    
+    def layer(self, key, build):
+        """Get a cached full-screen layer, building it on first use
+        
+        Args:
+            key: Hashable description of the layer's contents
+            build: Function drawing the layer onto the surface it is given
+        
+        Returns:
+            pygame.Surface: The layer
+        """
+        surface = self.layers.get(key)
+        if surface is None:
+            surface = pygame.Surface(self.screen.get_size())
+            build(surface)
+            self.layers[key] = surface
+        return surface
+    
+    def needs_redraw(self, frame_key):
+        """Check if a frame must be drawn, and mark it as drawn
+        
+        Args:
+            frame_key: Hashable description of the frame, or None for
+                frames that always change (such as animations)
+        
+        Returns:
+            bool: True if the caller must draw the frame now
+        """
+        if frame_key is not None and frame_key == self.frame_key:
+            self.frames_skipped += 1
+            return False
+        self.frame_key = frame_key
+        self.redrawn = True
+        self.frames_drawn += 1
+        return True
+    
+    def invalidate(self):
+        """Force the next frame to be drawn, e.g. after the window was exposed"""
+        self.frame_key = None
+    
+    def mark_dirty(self, rect):
+        """Add an area drawn over an unchanged frame to the next update
+        
+        Args:
+            rect (pygame.Rect): Changed area
+        """
+        self.dirty_rects.append(rect)
+    
+    def present(self):
+        """Update the display once with everything drawn this frame"""
+        if self.redrawn:
+            pygame.display.update()
+        elif self.dirty_rects:
+            pygame.display.update(self.dirty_rects)
+        self.redrawn = False
+        self.dirty_rects = []
@@ -0,0 +1,287 @@
+import hashlib
+import json
+
+import numpy as np
+
+# Window scores of the original hand-written heuristic
+DEFAULT_WEIGHTS = {
+    'center': 3,           # Own piece in the center column
+    'four': 100,           # Own line of four
+    'three': 5,            # Three own pieces and an empty cell
+    'two': 2,              # Two own pieces and two empty cells
+    'opponent_three': -4,  # Three opponent pieces and an empty cell
+    # Multiplier of the window scores of diagonal lines. The original
+    # heuristic built diagonal windows as lists, which never compare equal
+    # to a player number, so diagonals have always scored nothing.
+    'diagonal': 0,
+}
+
+_windows = {}
+
+
+def window_indices(rows, cols):
+    """Get the cells of every line of four on the board
+    
+    Args:
+        rows (int): Number of rows
+        cols (int): Number of columns
+    
+    Returns:
+        tuple: (straight, diagonal) arrays of shape (windows, 4) with flat
+            cell indices (row * cols + col); straight holds the horizontal
+            then the vertical lines, diagonal both kinds of diagonals
+    """
+    windows = _windows.get((rows, cols))
+    if windows is None:
+        lines = []
+        for r in range(rows):
+            for c in range(cols - 3):
+                lines.append([(r, c + i) for i in range(4)])
+        for c in range(cols):
+            for r in range(rows - 3):
+                lines.append([(r + i, c) for i in range(4)])
+        straight = len(lines)
+        for r in range(rows - 3):
+            for c in range(cols - 3):
+                lines.append([(r + i, c + i) for i in range(4)])
+        for r in range(3, rows):
+            for c in range(cols - 3):
+                lines.append([(r - i, c + i) for i in range(4)])
+        indices = np.array([[r * cols + c for r, c in line] for line in lines])
+        windows = _windows[(rows, cols)] = (indices[:straight], indices[straight:])
+    return windows
+
+
+class HeuristicEvaluator:
+    # Evaluators with batched = True get all leaves below a node in one call
+    batched = True
+    # Evaluators with symmetric = True score a position and its mirror image
+    # the same, so the AI may cache them under one key
+    symmetric = True
+    
+    def __init__(self, weights=None):
+        """Initialize the line-of-four heuristic
+        
+        Args:
+            weights (dict): Scores overriding DEFAULT_WEIGHTS
+        """
+        self.weights = dict(DEFAULT_WEIGHTS)
+        if weights:
+            unknown = set(weights) - set(DEFAULT_WEIGHTS)
+            if unknown:
+                raise ValueError("Unknown weights: %s" % ', '.join(sorted(unknown)))
+            self.weights.update(weights)
+        self.name = 'heuristic' if self.weights == DEFAULT_WEIGHTS else 'weights'
+        # Tells the results of different weights apart in persistent caches
+        if self.name == 'heuristic':
+            self.identity = 'heuristic'
+        else:
+            digest = hashlib.sha1(json.dumps(self.weights, sort_keys=True).encode())
+            self.identity = 'weights:' + digest.hexdigest()[:16]
+    
+    @classmethod
+    def load(cls, path):
+        """Load tuned weights from a JSON file
+        
+        Args:
+            path (str): JSON object mapping weight names to scores
+        
+        Returns:
+            HeuristicEvaluator: Evaluator using the weights
+        """
+        with open(path) as f:
+            return cls(json.load(f))
+    
+    def save(self, path):
+        """Write the weights to a JSON file
+        
+        Args:
+            path (str): Output file
+        """
+        with open(path, 'w') as f:
+            json.dump(self.weights, f, indent=2)
+    
+    def evaluate(self, cells, player):
+        """Score one position
+        
+        Args:
+            cells: 2D array of player numbers
+            player (int): Player the score is for
+        
+        Returns:
+            int: Score, higher is better for the player
+        """
+        return int(self.evaluate_batch(cells[np.newaxis], player)[0])
+    
+    def evaluate_batch(self, cells, player):
+        """Score a stack of positions
+        
+        Args:
+            cells (numpy.ndarray): Array of shape (n, rows, cols)
+            player (int): Player the scores are for
+        
+        Returns:
+            numpy.ndarray: Integer scores, shape (n,)
+        """
+        count, rows, cols = cells.shape
+        flat = cells.reshape(count, -1)
+        straight, diagonal = window_indices(rows, cols)
+        weights = self.weights
+        score = weights['center'] * np.count_nonzero(cells[:, :, cols // 2] == player, axis=1)
+        score += self._score_windows(flat[:, straight], player)
+        if weights['diagonal']:
+            score += weights['diagonal'] * self._score_windows(flat[:, diagonal], player)
+        return score
+    
+    def _score_windows(self, windows, player):
+        """Score lines of four cells
+        
+        Args:
+            windows (numpy.ndarray): Array of shape (n, windows, 4)
+            player (int): Player the scores are for
+        
+        Returns:
+            numpy.ndarray: Summed window scores per position, shape (n,)
+        """
+        own = np.count_nonzero(windows == player, axis=2)
+        other = np.count_nonzero(windows == 3 - player, axis=2)
+        empty = 4 - own - other
+        
+        weights = self.weights
+        score = weights['four'] * np.count_nonzero(own == 4, axis=1)
+        score += weights['three'] * np.count_nonzero((own == 3) & (empty == 1), axis=1)
+        score += weights['two'] * np.count_nonzero((own == 2) & (empty == 2), axis=1)
+        score += weights['opponent_three'] * np.count_nonzero((other == 3) & (empty == 1), axis=1)
+        return score
+
+
+class MLPEvaluator:
+    batched = True
+    # The input layer sees every cell separately, so mirror images score
+    # differently
+    symmetric = False
+    name = 'mlp'
+    
+    def __init__(self, hidden_weights, hidden_bias, output_weights, output_bias, scale=100.0):
+        """Initialize a one-hidden-layer network evaluator
+        
+        The input is two bit planes of the position seen from the player
+        being scored: its own pieces, then the opponent's. The output is
+        multiplied by scale and rounded, since the search relies on integer
+        scores, and kept below the win score.
+        
+        Args:
+            hidden_weights (numpy.ndarray): Shape (2 * rows * cols, hidden)
+            hidden_bias (numpy.ndarray): Shape (hidden,)
+            output_weights (numpy.ndarray): Shape (hidden,)
+            output_bias (float): Output bias
+            scale (float): Score of a network output of 1.0
+        """
+        self.hidden_weights = np.asarray(hidden_weights, dtype=np.float32)
+        self.hidden_bias = np.asarray(hidden_bias, dtype=np.float32)
+        self.output_weights = np.asarray(output_weights, dtype=np.float32).reshape(-1)
+        self.output_bias = float(output_bias)
+        self.scale = float(scale)
+        
+        digest = hashlib.sha1()
+        for array in (self.hidden_weights, self.hidden_bias, self.output_weights,
+                      np.float32([self.output_bias, self.scale])):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        self.identity = 'mlp:' + digest.hexdigest()[:16]
+    
+    @classmethod
+    def random(cls, rows=6, cols=7, hidden=64, seed=0):
+        """Create an untrained network, for benchmarks and as a training start
+        
+        Args:
+            rows (int): Number of rows on the board
+            cols (int): Number of columns on the board
+            hidden (int): Hidden units
+            seed (int): Random seed
+        
+        Returns:
+            MLPEvaluator: Evaluator with small random weights
+        """
+        rng = np.random.default_rng(seed)
+        inputs = 2 * rows * cols
+        return cls(rng.normal(0, inputs ** -0.5, (inputs, hidden)), np.zeros(hidden),
+                   rng.normal(0, hidden ** -0.5, hidden), 0.0)
+    
+    @classmethod
+    def load(cls, path):
+        """Load a network from a .npz file written by save()
+        
+        Args:
+            path (str): Input file
+        
+        Returns:
+            MLPEvaluator: Evaluator using the stored weights
+        """
+        with np.load(path) as data:
+            return cls(data['hidden_weights'], data['hidden_bias'], data['output_weights'],
+                       data['output_bias'], data['scale'] if 'scale' in data else 100.0)
+    
+    def save(self, path):
+        """Write the network to a .npz file
+        
+        Args:
+            path (str): Output file
+        """
+        np.savez(path, hidden_weights=self.hidden_weights, hidden_bias=self.hidden_bias,
+                 output_weights=self.output_weights, output_bias=self.output_bias,
+                 scale=self.scale)
+    
+    def evaluate(self, cells, player):
+        """Score one position
+        
+        Args:
+            cells: 2D array of player numbers
+            player (int): Player the score is for
+        
+        Returns:
+            int: Score, higher is better for the player
+        """
+        return int(self.evaluate_batch(cells[np.newaxis], player)[0])
+    
+    def evaluate_batch(self, cells, player):
+        """Score a stack of positions with one matrix product per layer
+        
+        Args:
+            cells (numpy.ndarray): Array of shape (n, rows, cols)
+            player (int): Player the scores are for
+        
+        Returns:
+            numpy.ndarray: Integer scores, shape (n,)
+        """
+        count = cells.shape[0]
+        inputs = np.concatenate((cells == player, cells == 3 - player), axis=1)
+        inputs = inputs.reshape(count, -1).astype(np.float32)
+        hidden = np.maximum(inputs @ self.hidden_weights + self.hidden_bias, 0)
+        output = hidden @ self.output_weights + self.output_bias
+        return np.clip(np.rint(output * self.scale), -99999, 99999).astype(int)
+
+
+EVALUATORS = ('heuristic', 'weights', 'mlp')
+
+
+def make_evaluator(name='heuristic', path=None):
+    """Create an evaluator by name
+    
+    Args:
+        name (str): 'heuristic' for the built-in weights, 'weights' for
+            heuristic weights loaded from a JSON file, or 'mlp' for a network
+            loaded from a .npz file (an untrained one if path is None)
+        path (str): Weights file
+    
+    Returns:
+        Evaluator object with evaluate() and evaluate_batch()
+    """
+    if name == 'heuristic':
+        return HeuristicEvaluator()
+    elif name == 'weights':
+        if path is None:
+            raise ValueError("The weights evaluator needs a weights file")
+        return HeuristicEvaluator.load(path)
+    elif name == 'mlp':
+        return MLPEvaluator.load(path) if path else MLPEvaluator.random()
+    raise ValueError("Unknown evaluator: %s" % name)
@@ -0,0 +1,121 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+
+def percentile(samples, pct):
+    """Get a percentile of a sorted list of samples
+    
+    Args:
+        samples (list): Sorted samples
+        pct (float): Percentile between 0 and 100
+    
+    Returns:
+        float: Sample at the given percentile
+    """
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+    return samples[index]
+
+
+async def request(reader, writer, message):
+    """Send one request and wait for its reply
+    
+    Args:
+        reader: asyncio.StreamReader for the connection
+        writer: asyncio.StreamWriter for the connection
+        message (dict): Request to send
+    
+    Returns:
+        dict: Decoded reply
+    """
+    writer.write(json.dumps(message).encode() + b'\n')
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def play_games(host, port, games, difficulty, latencies, counters):
+    """Play games back to back on one connection with random human moves
+    
+    Args:
+        host (str): Server host
+        port (int): Server port
+        games (int): Number of games to play
+        difficulty (str): AI difficulty to request
+        latencies (list): Move round-trip times are appended here
+        counters (dict): Aggregate counters updated in place
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(games):
+            state = await request(reader, writer,
+                                  {'op': 'new', 'difficulty': difficulty})
+            game_id = state['game']
+            while not state['game_over']:
+                top_row = state['board'][0]
+                col = random.choice([c for c, cell in enumerate(top_row) if cell == 0])
+                start = time.perf_counter()
+                reply = await request(reader, writer,
+                                      {'op': 'move', 'game': game_id, 'col': col})
+                if not reply['ok']:
+                    counters[reply['error']] = counters.get(reply['error'], 0) + 1
+                    # Back off before retrying when the server pushes back
+                    await asyncio.sleep(0.05)
+                    continue
+                latencies.append(time.perf_counter() - start)
+                counters['moves'] += 1
+                state = reply
+            await request(reader, writer, {'op': 'close', 'game': game_id})
+            counters['games'] += 1
+    finally:
+        writer.close()
+
+
+async def run(args):
+    """Run the load test and print a report
+    
+    Args:
+        args: Parsed command line arguments
+    """
+    latencies = []
+    counters = {'games': 0, 'moves': 0}
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        play_games(args.host, args.port, args.games, args.difficulty,
+                   latencies, counters)
+        for _ in range(args.clients)
+    ])
+    elapsed = time.perf_counter() - start
+    
+    latencies.sort()
+    print("Clients:      %d" % args.clients)
+    print("Games:        %d" % counters.pop('games'))
+    print("Moves:        %d" % counters['moves'])
+    print("Elapsed:      %.2f s" % elapsed)
+    print("Throughput:   %.1f moves/s" % (counters.pop('moves') / elapsed))
+    for pct in (50, 90, 99):
+        print("Latency p%-3d %8.2f ms" % (pct, percentile(latencies, pct) * 1000))
+    if latencies:
+        print("Latency max  %8.2f ms" % (latencies[-1] * 1000))
+    for error, count in sorted(counters.items()):
+        print("Rejected (%s): %d" % (error, count))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for server.py")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--clients', type=int, default=100,
+                        help="concurrent connections, one game at a time each")
+    parser.add_argument('--games', type=int, default=5,
+                        help="games played per client")
+    parser.add_argument('--difficulty', default='hard',
+                        choices=['easy', 'medium', 'hard'])
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
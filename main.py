@@ -1,14 +1,58 @@
 import pygame
+import random
 import sys
 import time
+import argparse
+import atexit
 from board import Board
 from ui import UI
 from ai import AI
+from profiler import FrameProfiler
+from ponder import Ponderer
+from analysis import Analyzer
+from analysis_cache import AnalysisCache, DEFAULT_PATH as ANALYSIS_CACHE_PATH
+from evaluators import EVALUATORS, make_evaluator
+from replay import EventRecorder
+from timecontrol import GameClock, format_clock
 
 class Connect4Game:
-    def __init__(self):
-        pygame.init()
+    def __init__(self, profile_frames=30, profile_path=None, startup_report=False, ponder=True,
+                 algorithm='alphabeta', analysis_cache_path=ANALYSIS_CACHE_PATH,
+                 evaluator=None, seed=None, recorder=None, replayer=None, clock_time=None,
+                 increment=0.0, memory_budget=None):
+        """Initialize the game
+        
+        Args:
+            profile_frames (int): Frames captured by cProfile when F4 is pressed
+            profile_path (str): Output file for cProfile captures
+            startup_report (bool): Print startup phase timings after the first frame
+            ponder (bool): Let the hard AI search during the human's turn
+            algorithm (str): Hard AI search, 'alphabeta' or 'pvs'
+            analysis_cache_path (str): File for hard AI results kept across
+                sessions, or None to disable it
+            evaluator: Hard AI leaf evaluator (default: the built-in heuristic)
+            seed (int): Seed for the AI's random moves, so sessions can be replayed
+            recorder: EventRecorder the input is written to, or None
+            replayer: EventReplayer the input is read from instead of pygame
+            clock_time (float): Seconds on each player's game clock, or None
+                for untimed games
+            increment (float): Seconds added to a player's clock per move
+            memory_budget (int): Bytes for all AI caches, split evenly between
+                the game AI and the analysis overlay, or None for the default
+                cache sizes
+        """
+        self.startup_report = startup_report
+        self.startup_times = []
+        self.startup_start = self.startup_mark = time.perf_counter()
+        if seed is not None:
+            random.seed(seed)
+        
+        # Only the subsystems the game uses; pygame.init() would also bring
+        # up audio, joystick and friends
+        pygame.display.init()
+        pygame.font.init()
         pygame.display.set_caption("Connect 4")
+        self.record_startup('pygame init')
         
         # Game constants - increased height to accommodate menu button
         self.WIDTH = 700
@@ -18,9 +62,23 @@ class Connect4Game:
         
         # Game state
         self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
+        self.record_startup('window')
         self.board = Board(self.BOARD_ROWS, self.BOARD_COLS)
         self.ui = UI(self.screen, self.WIDTH, self.HEIGHT)
-        self.ai = AI(self.board)
+        self.ai = AI(self.board, algorithm=algorithm, evaluator=evaluator)
+        if memory_budget:
+            self.ai.set_memory_budget(memory_budget // 2)
+        # Results are stored per evaluator, so any evaluator can share the file
+        if analysis_cache_path:
+            # Opened on the first hard search, written back in batches
+            self.ai.analysis_cache = AnalysisCache(analysis_cache_path)
+            atexit.register(self.ai.analysis_cache.close)
+        self.ponderer = Ponderer(self.ai) if ponder else None
+        
+        # Per-column analysis above the board (F2)
+        self.analyzer = Analyzer(self.ai.evaluator,
+                                 memory_budget=memory_budget // 2 if memory_budget else None)
+        self.show_analysis = False
         
         # Game settings
         self.game_mode = None  # 'pvp' or 'ai'
@@ -42,10 +100,53 @@ class Connect4Game:
         self.clock = pygame.time.Clock()
         self.FPS = 60
         
+        # Optional game clock; the hard AI budgets its search by it
+        self.game_clock = GameClock(clock_time, increment) if clock_time else None
+        self.flagged = None  # Player who ran out of time
+        self.clock_texts = None  # Clock readings on the screen
+        
+        # Frame profiling (F3: timing overlay, F4: cProfile capture)
+        self.profiler = FrameProfiler()
+        self.profile_frames = profile_frames
+        self.profile_path = profile_path
+        
+        # Input recording and replay (see replay.py)
+        self.frame = 0
+        self.recorder = recorder
+        self.replayer = replayer
+        if recorder is not None:
+            atexit.register(recorder.close)
+        if replayer is not None:
+            self.ui.get_mouse_pos = replayer.get_mouse_pos
+            self.profiler.time_all_frames()
+            if not replayer.realtime:
+                self.FPS = 0  # No frame rate limit
+        self.record_startup('game objects')
+    
+    def record_startup(self, phase):
+        """Record the time spent in a startup phase since the previous one
+        
+        Args:
+            phase (str): Name of the phase that just finished
+        """
+        now = time.perf_counter()
+        self.startup_times.append((phase, now - self.startup_mark))
+        self.startup_mark = now
+    
+    def print_startup_report(self):
+        """Print how long each startup phase took"""
+        print("Startup timings:")
+        for phase, elapsed in self.startup_times:
+            print("  %-14s %8.1f ms" % (phase, elapsed * 1000))
+        print("  %-14s %8.1f ms" % ('total', (self.startup_mark - self.startup_start) * 1000))
+    
     def run(self):
         """Main game loop"""
+        first_frame = True
         while True:
+            self.profiler.begin_frame()
             self.clock.tick(self.FPS)
+            self.profiler.mark('tick')
             
             if self.in_menu:
                 self.show_menu()
@@ -53,12 +154,61 @@ class Connect4Game:
                 self.show_settings()
             else:
                 self.play_game()
+            self.present()
+            self.frame += 1
+            
+            if first_frame:
+                first_frame = False
+                self.record_startup('first draw')
+                if self.startup_report:
+                    self.print_startup_report()
+    
+    def get_events(self):
+        """Get pending events, handling the analysis and profiling hotkeys
+        
+        Returns:
+            list: Pygame events for the current screen
+        """
+        if self.replayer is not None:
+            events = self.replayer.get_events(self.frame)
+        else:
+            events = pygame.event.get()
+        if self.recorder is not None:
+            self.recorder.record(self.frame, events, self.ui.get_mouse_pos())
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_F2:
+                    self.show_analysis = not self.show_analysis
+                    if not self.show_analysis:
+                        self.analyzer.stop()
+                    self.ui.compositor.invalidate()
+                elif event.key == pygame.K_F3:
+                    self.profiler.toggle_overlay()
+                    # Hiding the overlay needs the frame under it redrawn
+                    self.ui.compositor.invalidate()
+                elif event.key == pygame.K_F4:
+                    self.profiler.start_capture(self.profile_frames, self.profile_path)
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.ui.compositor.invalidate()
+        return events
+    
+    def present(self):
+        """Draw the profiler overlay and update the display once per frame"""
+        overlay_rect = self.profiler.draw_overlay(self.screen)
+        if overlay_rect is not None:
+            self.ui.compositor.mark_dirty(overlay_rect)
+        self.ui.compositor.present()
+        self.profiler.mark('display')
     
     def show_menu(self):
         """Display the game menu"""
+        self.analyzer.stop()
+        if self.game_clock is not None:
+            self.game_clock.stop()
         menu_choice = self.ui.draw_menu()
+        self.profiler.mark('draw')
         
-        for event in pygame.event.get():
+        for event in self.get_events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -82,12 +232,14 @@ class Connect4Game:
                 elif menu_choice == "quit":
                     pygame.quit()
                     sys.exit()
+        self.profiler.mark('events')
     
     def show_settings(self):
         """Display the settings menu"""
         action, value = self.ui.draw_settings()
+        self.profiler.mark('draw')
         
-        for event in pygame.event.get():
+        for event in self.get_events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -95,11 +247,11 @@ class Connect4Game:
             # Ignore mouse wheel events
             if event.type == pygame.MOUSEWHEEL:
                 continue
-                
+            
             if event.type == pygame.MOUSEBUTTONDOWN:
                 # Only process left mouse button clicks (button 1)
                 if event.button == 1:
-                    mouse_pos = pygame.mouse.get_pos()
+                    mouse_pos = self.ui.get_mouse_pos()
                     
                     # Check for difficulty button clicks
                     if self.ui.is_easy_button_clicked(mouse_pos):
@@ -114,11 +266,12 @@ class Connect4Game:
                     elif self.ui.is_settings_back_clicked():
                         self.in_settings = False
                         self.in_menu = True
+        self.profiler.mark('events')
     
     def play_game(self):
         """Main gameplay function"""
         # Handle events
-        for event in pygame.event.get():
+        for event in self.get_events():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -131,6 +284,7 @@ class Connect4Game:
                 if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:  # Left mouse button only
                     # Check if back button is clicked
                     if self.ui.is_back_button_clicked():
+                        self.stop_pondering()
                         self.in_menu = True
                         return
                     
@@ -138,38 +292,86 @@ class Connect4Game:
                     if self.game_mode == "pvp" or (self.game_mode == "ai" and self.current_player == 1):
                         col = self.ui.get_column_from_mouse()
                         if col is not None and self.board.is_valid_move(col):
+                            self.stop_pondering()
                             row = self.board.get_next_open_row(col)
                             self.start_animation(row, col, self.current_player)
+                            if self.game_clock is not None:
+                                self.game_clock.press()
             else:
                 # Game over state
                 if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:  # Left mouse button only
                     if self.ui.is_play_again_clicked():
                         self.reset_game()
                     elif self.ui.is_menu_clicked():
+                        self.stop_pondering()
                         self.in_menu = True
         
         # Process animation
         if self.animation_active:
             self.process_animation()
         
+        # Running out of time loses the game
+        if self.game_clock is not None and not self.game_over:
+            self.flagged = self.game_clock.flagged()
+            if self.flagged is not None:
+                self.game_clock.stop()
+                self.stop_pondering()
+                self.game_over = True
+        self.profiler.mark('events')
+        
         # AI's turn
         if not self.game_over and not self.animation_active and self.game_mode == "ai" and self.current_player == 2:
-            col = self.ai.get_best_move(self.ai_difficulty)
+            if self.ponderer is not None and self.ai_difficulty == 'hard':
+                self.ponderer.record_move(self.board)
+            if self.game_clock is None:
+                col = self.ai.get_best_move(self.ai_difficulty)
+            else:
+                col = self.ai.get_best_move(self.ai_difficulty, self.game_clock.time_left(2),
+                                            self.game_clock.increment)
+                self.game_clock.press()
             if col is not None:
                 row = self.board.get_next_open_row(col)
                 self.start_animation(row, col, self.current_player)
+            self.profiler.mark('ai')
         
-        # Draw the game
-        self.ui.draw_board(self.board.board, self.current_player)
-        
-        # Draw animation
-        if self.animation_active:
-            self.draw_animation()
-        
-        if self.game_over:
-            self.ui.draw_game_over(self.board.check_win(1), self.board.check_win(2), self.board.is_full())
+        # Keep the analysis on the current position
+        analysis = None
+        if self.show_analysis and not self.game_over:
+            self.analyzer.follow(self.board)
+            analysis = self.analyzer.snapshot()
+        else:
+            self.analyzer.stop()
         
-        pygame.display.update()
+        # Draw the game, unless the frame on the screen is still current;
+        # animation frames always change
+        frame_key = None
+        if not self.animation_active:
+            frame_key = ('game', self.board.key(), self.current_player, self.game_over,
+                         self.ui.game_hover_key(), analysis and analysis[2])
+        clock_texts = None
+        if self.game_clock is not None:
+            clock_texts = (self.game_clock.running,
+                           tuple(format_clock(self.game_clock.time_left(p)) for p in (1, 2)))
+        if self.ui.compositor.needs_redraw(frame_key):
+            self.ui.draw_board(self.board.board, self.current_player)
+            if analysis is not None:
+                self.ui.draw_analysis(analysis[0], analysis[1])
+            if clock_texts is not None:
+                self.ui.draw_clocks(*clock_texts)
+            
+            # Draw animation
+            if self.animation_active:
+                self.draw_animation()
+            
+            if self.game_over:
+                self.ui.draw_game_over(self.board.check_win(1), self.board.check_win(2), self.board.is_full(),
+                                       self.flagged)
+        elif clock_texts != self.clock_texts:
+            # Only the clocks changed; redraw just them
+            for rect in self.ui.draw_clocks(*clock_texts):
+                self.ui.compositor.mark_dirty(rect)
+        self.clock_texts = clock_texts
+        self.profiler.mark('draw')
     
     def start_animation(self, row, col, player):
         """Start the piece dropping animation
@@ -203,6 +405,9 @@ class Connect4Game:
                 self.game_over = True
             else:
                 self.current_player = 3 - self.current_player  # Switch player (1->2, 2->1)
+                if self.game_clock is not None:
+                    self.game_clock.start(self.current_player)
+                self.start_pondering()
     
     def draw_animation(self):
         """Draw the animation frame"""
@@ -221,13 +426,82 @@ class Connect4Game:
             # Add highlight
             pygame.draw.circle(self.screen, (247, 220, 111), (x-10, self.animation_y-10), self.ui.RADIUS//4)
     
+    def start_pondering(self):
+        """Search on the human's time when they are playing the hard AI"""
+        if (self.ponderer is not None and self.game_mode == "ai" and
+                self.ai_difficulty == 'hard' and self.current_player == 1):
+            self.ponderer.start(self.board)
+    
+    def stop_pondering(self):
+        """Stop any background search before the position changes"""
+        if self.ponderer is not None:
+            self.ponderer.stop()
+    
     def reset_game(self):
         """Reset the game state"""
+        self.stop_pondering()
         self.board.reset()
         self.current_player = 1
         self.game_over = False
         self.animation_active = False
+        self.flagged = None
+        if self.game_clock is not None:
+            self.game_clock.reset()
+            self.game_clock.start(1)
+        self.start_pondering()
 
 if __name__ == "__main__":
-    game = Connect4Game()
+    parser = argparse.ArgumentParser(description="Connect 4")
+    parser.add_argument('--profile-frames', type=int, default=30,
+                        help="frames captured by cProfile when F4 is pressed")
+    parser.add_argument('--profile-out', default=None,
+                        help="output file for cProfile captures")
+    parser.add_argument('--startup-report', action='store_true',
+                        help="print startup timings after the first frame")
+    parser.add_argument('--no-ponder', action='store_true',
+                        help="keep the hard AI idle during the human's turn")
+    parser.add_argument('--search', default='alphabeta', choices=['alphabeta', 'pvs'],
+                        help="hard AI search algorithm")
+    parser.add_argument('--analysis-cache', default=ANALYSIS_CACHE_PATH,
+                        help="file where hard AI results are kept across sessions")
+    parser.add_argument('--no-analysis-cache', action='store_true',
+                        help="do not read or write the analysis cache")
+    parser.add_argument('--evaluator', default='heuristic', choices=EVALUATORS,
+                        help="hard AI position evaluation")
+    parser.add_argument('--evaluator-file', default=None,
+                        help="weights for the evaluator (JSON for weights, .npz for mlp)")
+    parser.add_argument('--clock', type=float, default=None,
+                        help="seconds on each player's game clock (default: untimed)")
+    parser.add_argument('--increment', type=float, default=0.0,
+                        help="seconds added to a player's clock after each move")
+    parser.add_argument('--memory-budget', type=float, default=None,
+                        help="MiB for all AI caches; a small budget slows the AI down")
+    parser.add_argument('--record', default=None,
+                        help="record the input to a file that replay.py can play back")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="seed for the AI's random moves")
+    args = parser.parse_args()
+    
+    seed = args.seed
+    memory_budget = int(args.memory_budget * 2 ** 20) if args.memory_budget else None
+    recorder = None
+    if args.record:
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        recorder = EventRecorder(args.record, {
+            'seed': seed,
+            'ponder': not args.no_ponder,
+            'algorithm': args.search,
+            'evaluator': args.evaluator,
+            'evaluator_file': args.evaluator_file,
+            'clock': args.clock,
+            'increment': args.increment,
+            'memory_budget': memory_budget,
+        })
+    game = Connect4Game(args.profile_frames, args.profile_out, args.startup_report,
+                        not args.no_ponder, args.search,
+                        None if args.no_analysis_cache else args.analysis_cache,
+                        make_evaluator(args.evaluator, args.evaluator_file),
+                        seed, recorder, clock_time=args.clock, increment=args.increment,
+                        memory_budget=memory_budget)
     game.run()
@@ -0,0 +1,157 @@
+import sys
+from itertools import islice
+
+import numpy as np
+
+# Smallest share of a budget kept for each cache, so search never runs
+# without one
+MIN_CACHE_ENTRIES = 1024
+MIN_BEST_MOVES = 64
+
+# Bytes per entry assumed before a cache has entries to measure: a large
+# int key, a 2-tuple and one int outside CPython's small int cache, plus
+# the entry's share of the dict's hash table
+DEFAULT_ENTRY_BYTES = 170
+
+
+def sizeof(obj, seen=None):
+    """Estimate the memory held by an object and everything it references
+    
+    Small ints are shared by the interpreter and are not counted; NumPy
+    arrays count their data buffer.
+    
+    Args:
+        obj: Object to measure
+        seen (set): Ids of objects already counted
+    
+    Returns:
+        int: Estimated bytes
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, bool) or obj is None:
+        return 0
+    if isinstance(obj, int) and -5 <= obj <= 256:
+        return 0
+    if isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj) + (obj.nbytes if obj.base is None else 0)
+    
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += sizeof(key, seen) + sizeof(value, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += sizeof(item, seen)
+    elif hasattr(obj, '__dict__'):
+        size += sizeof(vars(obj), seen)
+    return size
+
+
+def entry_bytes(table, sample=256):
+    """Estimate the bytes one entry of a cache dict takes
+    
+    Sizes a sample of the oldest entries rather than the whole table.
+    
+    Args:
+        table (dict): Cache to measure
+        sample (int): Entries measured
+    
+    Returns:
+        float: Average bytes per entry, including its share of the hash table
+    """
+    if not table:
+        return DEFAULT_ENTRY_BYTES
+    items = list(islice(table.items(), sample))
+    seen = set()
+    measured = sum(sizeof(key, seen) + sizeof(value, seen) for key, value in items)
+    return measured / len(items) + sys.getsizeof(table) / len(table)
+
+
+def evict_oldest(table, count):
+    """Remove the entries that were inserted first
+    
+    The dict is rebuilt in place: deleting keys never shrinks its hash
+    table, and other AIs may hold the same dict object.
+    
+    Args:
+        table (dict): Cache to trim
+        count (int): Entries to remove
+    """
+    kept = list(islice(table.items(), count, None))
+    table.clear()
+    table.update(kept)
+
+
+class MemoryBudget:
+    def __init__(self, limit, cache_share=0.8):
+        """Initialize a memory budget for the caches of an AI
+        
+        The budget covers every structure the AI owns: the transposition
+        table, the finished root searches, the evaluator's tables and the
+        analysis cache's unwritten results. The fixed structures are
+        measured first; the rest of the budget caps the two caches, which
+        evict their oldest entries once full. A tight budget only means
+        smaller caches, so the search gets slower instead of failing.
+        
+        Args:
+            limit (int): Budget in bytes
+            cache_share (float): Part of the budget left after the fixed
+                structures that goes to the transposition table; the rest
+                holds finished root searches
+        """
+        self.limit = limit
+        self.cache_share = cache_share
+    
+    def report(self, ai):
+        """Measure each structure owned by an AI
+        
+        Args:
+            ai: AI object
+        
+        Returns:
+            dict: Structure name to estimated bytes, plus 'total'
+        """
+        sizes = {
+            'cache': len(ai.cache) * entry_bytes(ai.cache),
+            'best_moves': len(ai.best_moves) * entry_bytes(ai.best_moves),
+            'evaluator': sizeof(ai.evaluator),
+            'analysis_cache': 0,
+        }
+        if ai.analysis_cache is not None:
+            with ai.analysis_cache.lock:
+                sizes['analysis_cache'] = sizeof(ai.analysis_cache.pending)
+        sizes = {name: int(size) for name, size in sizes.items()}
+        sizes['total'] = sum(sizes.values())
+        return sizes
+    
+    def apply(self, ai):
+        """Size the AI's caches to the budget and evict what no longer fits
+        
+        Cheap enough to call after every move; entry sizes are re-measured
+        each time, so the caps follow the entries the search really stores.
+        
+        Args:
+            ai: AI object
+        
+        Returns:
+            dict: Report of the structures after trimming (see report)
+        """
+        fixed = sizeof(ai.evaluator)
+        if ai.analysis_cache is not None:
+            with ai.analysis_cache.lock:
+                fixed += sizeof(ai.analysis_cache.pending)
+        available = max(0, self.limit - fixed)
+        
+        ai.MAX_CACHE_ENTRIES = max(MIN_CACHE_ENTRIES,
+                                   int(available * self.cache_share / entry_bytes(ai.cache)))
+        ai.MAX_BEST_MOVES = max(MIN_BEST_MOVES,
+                                int(available * (1 - self.cache_share) / entry_bytes(ai.best_moves)))
+        if len(ai.cache) > ai.MAX_CACHE_ENTRIES:
+            evict_oldest(ai.cache, len(ai.cache) - ai.MAX_CACHE_ENTRIES)
+        if len(ai.best_moves) > ai.MAX_BEST_MOVES:
+            evict_oldest(ai.best_moves, len(ai.best_moves) - ai.MAX_BEST_MOVES)
+        return self.report(ai)
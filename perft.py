@@ -0,0 +1,276 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from board import Board
+from ai import AI
+
+BOARD_ROWS = 6
+BOARD_COLS = 7
+
+
+class ArrayBackend:
+    name = 'array'
+    
+    def __init__(self, rows, cols):
+        """Initialize the reference backend: the AI's scans of the cell array
+        
+        Uses AI._get_valid_locations, AI._get_next_open_row,
+        AI._check_win_state and AI._is_board_full on a plain NumPy array.
+        
+        Args:
+            rows (int): Number of rows
+            cols (int): Number of columns
+        """
+        self.cells = np.zeros((rows, cols), dtype=int)
+        self.ai = AI(Board(rows, cols))
+        self.stack = []
+    
+    def moves(self):
+        """Get the columns that are not full
+        
+        Returns:
+            list: Column indices
+        """
+        return self.ai._get_valid_locations(self.cells)
+    
+    def play(self, col, player):
+        """Drop a piece into a column
+        
+        Args:
+            col (int): Column to play, which must not be full
+            player (int): Player number
+        """
+        row = self.ai._get_next_open_row(self.cells, col)
+        self.cells[row][col] = player
+        self.stack.append((row, col))
+    
+    def undo(self):
+        """Take back the last move"""
+        row, col = self.stack.pop()
+        self.cells[row][col] = 0
+    
+    def won(self, player):
+        """Check whether a player has four in a row anywhere on the board
+        
+        Args:
+            player (int): Player number
+        
+        Returns:
+            bool: True if the player has won
+        """
+        return self.ai._check_win_state(self.cells, player)
+    
+    def full(self):
+        """Check whether every column is full
+        
+        Returns:
+            bool: True if no move is left
+        """
+        return self.ai._is_board_full(self.cells)
+
+
+class BoardBackend:
+    name = 'board'
+    
+    def __init__(self, rows, cols):
+        """Initialize the backend used by the game loop
+        
+        Moves go through Board.get_next_open_row and Board.drop_piece, and
+        wins are found by the full scan of Board.check_win.
+        
+        Args:
+            rows (int): Number of rows
+            cols (int): Number of columns
+        """
+        self.board = Board(rows, cols)
+    
+    def moves(self):
+        """Get the columns that are not full
+        
+        Returns:
+            list: Column indices
+        """
+        return self.board.get_valid_locations()
+    
+    def play(self, col, player):
+        """Drop a piece into a column
+        
+        Args:
+            col (int): Column to play, which must not be full
+            player (int): Player number
+        """
+        self.board.drop_piece(self.board.get_next_open_row(col), col, player)
+    
+    def undo(self):
+        """Take back the last move"""
+        self.board.undo()
+    
+    def won(self, player):
+        """Check whether a player has four in a row anywhere on the board
+        
+        Args:
+            player (int): Player number
+        
+        Returns:
+            bool: True if the player has won
+        """
+        return self.board.check_win(player)
+    
+    def full(self):
+        """Check whether every column is full
+        
+        Returns:
+            bool: True if no move is left
+        """
+        return self.board.is_full()
+
+
+class BitboardBackend(BoardBackend):
+    name = 'bitboard'
+    
+    def __init__(self, rows, cols):
+        """Initialize the backend used by the search
+        
+        Moves go through Board.play and wins are found on the bitboards by
+        Board.last_move_won.
+        
+        Args:
+            rows (int): Number of rows
+            cols (int): Number of columns
+        """
+        super().__init__(rows, cols)
+    
+    def play(self, col, player):
+        """Drop a piece into a column, updating the bitboards
+        
+        Args:
+            col (int): Column to play, which must not be full
+            player (int): Player number
+        """
+        self.board.play(col, player)
+    
+    def won(self, player):
+        """Check whether the last move made four in a row
+        
+        Only lines through the last move are looked at, so this must be
+        called right after player moved.
+        
+        Args:
+            player (int): Player who made the last move
+        
+        Returns:
+            bool: True if the player has won
+        """
+        return self.board.last_move_won()
+
+
+BACKENDS = {backend.name: backend for backend in (ArrayBackend, BoardBackend, BitboardBackend)}
+
+
+def perft(backend, depth, player):
+    """Enumerate every move sequence up to a depth
+    
+    Positions where the last move won or filled the board are counted and
+    not expanded further.
+    
+    Args:
+        backend: Backend object holding the start position
+        depth (int): Number of moves to look ahead
+        player (int): Player to move in the start position
+    
+    Returns:
+        list: Per ply, [positions, wins for player 1, wins for player 2, draws]
+    """
+    counts = [[0, 0, 0, 0] for _ in range(depth)]
+    
+    def walk(ply, player):
+        for col in backend.moves():
+            backend.play(col, player)
+            row = counts[ply]
+            row[0] += 1
+            if backend.won(player):
+                row[player] += 1
+            elif backend.full():
+                row[3] += 1
+            elif ply + 1 < depth:
+                walk(ply + 1, 3 - player)
+            backend.undo()
+    
+    if depth > 0:
+        walk(0, player)
+    return counts
+
+
+def run(depth, moves, backends):
+    """Run perft on every backend, print the counts and compare them
+    
+    Args:
+        depth (int): Number of moves to look ahead
+        moves (list): Columns played from the empty board to reach the
+            start position
+        backends (list): Backend names
+    
+    Returns:
+        int: Number of backends whose counts differ from the first one
+    """
+    results = []
+    for name in backends:
+        backend = BACKENDS[name](BOARD_ROWS, BOARD_COLS)
+        for i, col in enumerate(moves):
+            if col not in backend.moves():
+                raise ValueError("Column %d is full" % col)
+            backend.play(col, 1 + i % 2)
+            if backend.won(1 + i % 2) or backend.full():
+                raise ValueError("The game is over after move %d" % (i + 1))
+        start = time.perf_counter()
+        counts = perft(backend, depth, 1 + len(moves) % 2)
+        elapsed = time.perf_counter() - start
+        results.append((name, counts, elapsed))
+    
+    reference_name, reference, _ = results[0]
+    print("%4s %12s %10s %10s %10s" % ('ply', 'positions', 'p1 wins', 'p2 wins', 'draws'))
+    for ply, row in enumerate(reference, 1):
+        print("%4d %12d %10d %10d %10d" % (ply, *row))
+    
+    print("%-10s %10s %12s  %s" % ('backend', 'seconds', 'positions/s', 'counts'))
+    mismatches = 0
+    for name, counts, elapsed in results:
+        total = sum(row[0] for row in counts)
+        same = counts == reference
+        mismatches += not same
+        print("%-10s %10.3f %12.0f  %s" % (name, elapsed, total / elapsed if elapsed else 0.0,
+                                         'match' if same else 'DIFFER from %s' % reference_name))
+        if not same:
+            for ply, (row, expected) in enumerate(zip(counts, reference), 1):
+                if row != expected:
+                    print("    ply %d: %s, expected %s" % (ply, row, expected))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Connect 4 perft: count every position "
+                                                 "to a depth with each board backend")
+    parser.add_argument('--depth', type=int, default=5)
+    parser.add_argument('--moves', default='',
+                        help="start position as the columns played from the empty board, "
+                             "0-based (e.g. 3342)")
+    parser.add_argument('--backends', default=','.join(BACKENDS),
+                        help="comma-separated backends, compared to the first (default: %(default)s)")
+    args = parser.parse_args()
+    
+    backends = args.backends.split(',')
+    for name in backends:
+        if name not in BACKENDS:
+            parser.error("unknown backend %s (choose from %s)" % (name, ', '.join(BACKENDS)))
+    try:
+        mismatches = run(args.depth, [int(c) for c in args.moves], backends)
+    except ValueError as e:
+        parser.error(str(e))
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
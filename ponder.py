@@ -0,0 +1,89 @@
+import threading
+
+from ai import AI, SearchAborted
+
+
+class Ponderer:
+    def __init__(self, ai):
+        """Initialize pondering for an AI
+        
+        The ponder searches run on a second AI that shares the transposition
+        table and the finished root results of the given AI, so whatever it
+        finds is picked up by ai.get_best_move on the AI's next turn.
+        
+        Args:
+            ai: AI object whose caches are filled while the human thinks
+        """
+        self.ai = ai
+        self.worker = AI(ai.board, ai.cache, ai.best_moves, ai.algorithm, ai.evaluator)
+        self.worker.analysis_cache = ai.analysis_cache
+        self.thread = None
+        self.stop_event = threading.Event()
+        
+        # Replies that were searched to completion during pondering
+        self.pondered = set()
+        self.hits = 0
+        self.misses = 0
+    
+    def start(self, board):
+        """Start searching the AI's answers to the human's likely replies
+        
+        Args:
+            board: Board object with the human to move (copied before use)
+        """
+        self.stop()
+        self.stop_event = threading.Event()
+        self.pondered = set()
+        # The shared caches stay within the AI's memory budget
+        self.worker.MAX_CACHE_ENTRIES = self.ai.MAX_CACHE_ENTRIES
+        self.worker.MAX_BEST_MOVES = self.ai.MAX_BEST_MOVES
+        self.thread = threading.Thread(target=self._ponder,
+                                       args=(board.copy(), self.stop_event),
+                                       daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Abort pondering and wait for the background search to exit"""
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+    
+    def record_move(self, board):
+        """Count whether the position after the human's move was pondered
+        
+        Args:
+            board: Board object after the human's move, with the AI to move
+        """
+        if board.canonical_key()[0] in self.pondered:
+            self.hits += 1
+        else:
+            self.misses += 1
+    
+    def _ponder(self, board, stop_event):
+        """Search each human reply in turn, most dangerous replies first
+        
+        Args:
+            board: Private copy of the position with the human to move
+            stop_event (threading.Event): Set when pondering must stop
+        """
+        worker = self.worker
+        worker.should_stop = stop_event.is_set
+        
+        replies = []
+        for col in board.get_valid_locations():
+            board.play(col, worker.OPPONENT)
+            if not board.last_move_won() and not board.is_full():
+                # Lower scores are better for the human
+                replies.append((worker._evaluate_board(board.board), col))
+            board.undo()
+        replies.sort()
+        
+        try:
+            for _, col in replies:
+                board.play(col, worker.OPPONENT)
+                worker.search(board)
+                self.pondered.add(board.canonical_key()[0])
+                board.undo()
+        except SearchAborted:
+            pass
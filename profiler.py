@@ -0,0 +1,180 @@
+import cProfile
+import time
+from collections import deque
+
+import pygame
+
+
+class FrameProfiler:
+    # Phases of one frame, in the order they happen in the game loop
+    PHASES = ('tick', 'events', 'ai', 'draw', 'display')
+    
+    def __init__(self, history=120):
+        """Initialize the frame profiler
+        
+        Timing only happens while the overlay is shown or a cProfile
+        capture is running; otherwise every hook returns after a single
+        attribute check.
+        
+        Args:
+            history (int): Number of frames kept for averages and the histogram
+        """
+        self.history = history
+        self.active = False
+        self.overlay_visible = False
+        self.timing_all = False  # Time every frame, e.g. for a replay's report
+        self.frame_times = deque(maxlen=history)
+        self.phase_times = {phase: deque(maxlen=history) for phase in self.PHASES}
+        self._current = None
+        self._frame_start = 0.0
+        self._last = 0.0
+        
+        # cProfile capture state
+        self._profile = None
+        self._capture_left = 0
+        self._capture_path = None
+        
+        self._font = None
+    
+    def toggle_overlay(self):
+        """Show or hide the timing overlay"""
+        self.overlay_visible = not self.overlay_visible
+        self._update_active()
+    
+    def start_capture(self, frames, path=None):
+        """Profile the next frames with cProfile and dump the stats to disk
+        
+        Args:
+            frames (int): Number of frames to capture
+            path (str): Output file (default: profile_<timestamp>.prof)
+        """
+        if self._profile is not None or frames <= 0:
+            return
+        self._capture_left = frames
+        self._capture_path = path or time.strftime('profile_%Y%m%d_%H%M%S.prof')
+        self._profile = cProfile.Profile()
+        self._update_active()
+        self._profile.enable()
+    
+    def time_all_frames(self):
+        """Time every frame from now on and keep all of them
+        
+        Used by replays, which report on the whole session instead of the
+        last frames.
+        """
+        self.timing_all = True
+        self.frame_times = deque()
+        self.phase_times = {phase: deque() for phase in self.PHASES}
+        self._update_active()
+    
+    def is_capturing(self):
+        """Check if a cProfile capture is running
+        
+        Returns:
+            bool: True while frames are being captured
+        """
+        return self._profile is not None
+    
+    def begin_frame(self):
+        """Mark the start of a frame"""
+        if not self.active:
+            return
+        now = time.perf_counter()
+        if self._current is not None:
+            self._finish_frame(now)
+        self._current = dict.fromkeys(self.PHASES, 0.0)
+        self._frame_start = now
+        self._last = now
+    
+    def mark(self, phase):
+        """Attribute the time since the previous mark to a phase
+        
+        Args:
+            phase (str): One of PHASES
+        """
+        if not self.active:
+            return
+        now = time.perf_counter()
+        if self._current is not None:
+            self._current[phase] += now - self._last
+        self._last = now
+    
+    def _finish_frame(self, now):
+        """Record the frame that started at the previous begin_frame
+        
+        Args:
+            now (float): Timestamp of the start of the next frame
+        """
+        self.frame_times.append(now - self._frame_start)
+        for phase, elapsed in self._current.items():
+            self.phase_times[phase].append(elapsed)
+        
+        if self._profile is not None:
+            self._capture_left -= 1
+            if self._capture_left <= 0:
+                self._profile.disable()
+                self._profile.dump_stats(self._capture_path)
+                print("Saved cProfile capture to %s" % self._capture_path)
+                self._profile = None
+                self._update_active()
+    
+    def _update_active(self):
+        """Enable timing only while someone looks at the numbers"""
+        self.active = self.overlay_visible or self.timing_all or self._profile is not None
+        if not self.active:
+            self._current = None
+    
+    def averages(self):
+        """Get the average time per phase over the recorded history
+        
+        Returns:
+            dict: Phase name to average seconds, plus 'frame'
+        """
+        result = {}
+        for phase, samples in self.phase_times.items():
+            result[phase] = sum(samples) / len(samples) if samples else 0.0
+        frames = self.frame_times
+        result['frame'] = sum(frames) / len(frames) if frames else 0.0
+        return result
+    
+    def draw_overlay(self, screen):
+        """Draw frame time, FPS, per-phase times and a frame time histogram
+        
+        Args:
+            screen: Pygame surface to draw on
+        
+        Returns:
+            pygame.Rect: Area covered by the overlay, or None if hidden
+        """
+        if not self.overlay_visible:
+            return None
+        if self._font is None:
+            # The default font needs no system font lookup
+            self._font = pygame.font.Font(None, 18)
+        
+        panel = pygame.Rect(8, 8, 250, 150)
+        pygame.draw.rect(screen, (0, 0, 0), panel)
+        pygame.draw.rect(screen, (255, 255, 255), panel, 1)
+        
+        averages = self.averages()
+        frame = averages['frame']
+        fps = 1.0 / frame if frame else 0.0
+        lines = ["frame %5.2f ms   %5.1f FPS" % (frame * 1000, fps)]
+        for phase in self.PHASES:
+            lines.append("%-8s %6.2f ms" % (phase, averages[phase] * 1000))
+        y = panel.y + 4
+        for line in lines:
+            screen.blit(self._font.render(line, True, (255, 255, 255)), (panel.x + 6, y))
+            y += 14
+        
+        # Rolling histogram of frame times, scaled so 33 ms fills the graph
+        graph = pygame.Rect(panel.x + 6, y + 4, panel.width - 12, panel.bottom - y - 10)
+        budget_y = graph.bottom - graph.height // 2  # 60 FPS budget
+        pygame.draw.line(screen, (46, 204, 113), (graph.x, budget_y), (graph.right, budget_y))
+        bar_width = max(1, graph.width // self.history)
+        for i, elapsed in enumerate(self.frame_times):
+            height = min(graph.height, int(graph.height * elapsed * 30))
+            color = (231, 76, 60) if elapsed > 1 / 55 else (84, 160, 255)
+            pygame.draw.rect(screen, color,
+                             (graph.x + i * bar_width, graph.bottom - height, bar_width, height))
+        return panel
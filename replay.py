@@ -0,0 +1,228 @@
+import argparse
+import json
+import os
+import time
+
+import pygame
+
+# Event attributes that are positions; JSON turns their tuples into lists
+_POSITION_ATTRIBUTES = ('pos', 'rel')
+
+
+def encode_event(event):
+    """Convert a pygame event to a JSON-friendly dict
+    
+    Args:
+        event: Pygame event
+    
+    Returns:
+        dict: Event type and its JSON-serializable attributes
+    """
+    data = {'type': event.type}
+    for name, value in event.dict.items():
+        if isinstance(value, tuple):
+            value = list(value)
+        if isinstance(value, (int, float, str, bool, list)) or value is None:
+            data[name] = value
+    return data
+
+
+def decode_event(data):
+    """Rebuild a pygame event written by encode_event
+    
+    Args:
+        data (dict): Encoded event
+    
+    Returns:
+        pygame.event.Event: The event
+    """
+    attributes = dict(data)
+    event_type = attributes.pop('type')
+    for name in _POSITION_ATTRIBUTES:
+        if name in attributes:
+            attributes[name] = tuple(attributes[name])
+    return pygame.event.Event(event_type, attributes)
+
+
+class EventRecorder:
+    def __init__(self, path, settings):
+        """Initialize recording of a game session to a JSON lines file
+        
+        The first line holds the game settings, including the random seed.
+        After that there is one line for every frame with events or a mouse
+        move: the frame number, its time since the start, the mouse
+        position and the events.
+        
+        Args:
+            path (str): Output file
+            settings (dict): Game settings needed to replay the session
+        """
+        self.file = open(path, 'w')
+        self.file.write(json.dumps(dict(settings, version=1)) + '\n')
+        self.start = time.perf_counter()
+        self.mouse = None
+    
+    def record(self, frame, events, mouse):
+        """Record the input of one frame
+        
+        Args:
+            frame (int): Frame number
+            events (list): Pygame events of the frame
+            mouse (tuple): Mouse position during the frame
+        """
+        if not events and mouse == self.mouse:
+            return
+        self.mouse = mouse
+        line = {
+            'frame': frame,
+            't': round(time.perf_counter() - self.start, 4),
+            'mouse': list(mouse),
+            'events': [encode_event(event) for event in events],
+        }
+        self.file.write(json.dumps(line) + '\n')
+    
+    def close(self):
+        """Finish the recording"""
+        if not self.file.closed:
+            self.file.close()
+
+
+class EventReplayer:
+    def __init__(self, path, realtime=False):
+        """Initialize the replay of a recorded session
+        
+        Args:
+            path (str): Recording written by EventRecorder
+            realtime (bool): Wait for each frame's recorded time instead of
+                replaying as fast as possible
+        """
+        with open(path) as f:
+            self.settings = json.loads(f.readline())
+            self.frames = [json.loads(line) for line in f if line.strip()]
+        self.realtime = realtime
+        self.index = 0
+        self.mouse = (0, 0)
+        self.start = None
+        self.finished = False
+    
+    def get_mouse_pos(self):
+        """Get the recorded mouse position; replaces UI.get_mouse_pos
+        
+        Returns:
+            tuple: Mouse position of the current frame
+        """
+        return self.mouse
+    
+    def get_events(self, frame):
+        """Get the recorded events of a frame
+        
+        Once the recording is exhausted a QUIT event ends the game loop.
+        
+        Args:
+            frame (int): Frame number
+        
+        Returns:
+            list: Pygame events
+        """
+        if self.start is None:
+            self.start = time.perf_counter()
+        if self.index >= len(self.frames):
+            self.finished = True
+            return [pygame.event.Event(pygame.QUIT)]
+        
+        entry = self.frames[self.index]
+        if entry['frame'] > frame:
+            return []
+        self.index += 1
+        if self.realtime:
+            delay = self.start + entry['t'] - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        self.mouse = tuple(entry['mouse'])
+        return [decode_event(data) for data in entry['events']]
+
+
+def summarize(profiler):
+    """Summarize the frame times collected during a replay
+    
+    Args:
+        profiler: FrameProfiler that timed the replay
+    
+    Returns:
+        dict: For the whole frame and each phase, mean, p50, p95, p99 and
+            max in milliseconds
+    """
+    series = {'frame': list(profiler.frame_times)}
+    for phase, samples in profiler.phase_times.items():
+        series[phase] = list(samples)
+    summary = {}
+    for name, samples in series.items():
+        samples.sort()
+        if not samples:
+            continue
+        summary[name] = {
+            'mean': sum(samples) / len(samples) * 1000,
+            'p50': samples[len(samples) // 2] * 1000,
+            'p95': samples[int(len(samples) * 0.95)] * 1000,
+            'p99': samples[int(len(samples) * 0.99)] * 1000,
+            'max': samples[-1] * 1000,
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded Connect 4 session "
+                                                 "and report frame timings")
+    parser.add_argument('recording', help="file written by main.py --record")
+    parser.add_argument('--realtime', action='store_true',
+                        help="replay at the recorded speed instead of as fast as possible")
+    parser.add_argument('--window', action='store_true',
+                        help="show the replay in a window instead of the dummy video driver")
+    parser.add_argument('--out', default=None, help="write the timing summary as JSON")
+    args = parser.parse_args()
+    
+    if not args.window:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    # Imported here so the video driver is chosen before the game starts
+    from main import Connect4Game
+    from evaluators import make_evaluator
+    
+    replayer = EventReplayer(args.recording, args.realtime)
+    settings = replayer.settings
+    if settings.get('clock'):
+        print("Timed session: the hard AI searches as deep as its clock allows, "
+              "so its moves may differ from the recording on a faster or slower machine")
+    game = Connect4Game(ponder=settings.get('ponder', False),
+                        algorithm=settings.get('algorithm', 'alphabeta'),
+                        analysis_cache_path=None,
+                        evaluator=make_evaluator(settings.get('evaluator', 'heuristic'),
+                                                 settings.get('evaluator_file')),
+                        seed=settings['seed'],
+                        clock_time=settings.get('clock'),
+                        increment=settings.get('increment', 0.0),
+                        memory_budget=settings.get('memory_budget'),
+                        replayer=replayer)
+    
+    start = time.perf_counter()
+    try:
+        game.run()
+    except SystemExit:
+        pass
+    elapsed = time.perf_counter() - start
+    
+    frames = len(game.profiler.frame_times)
+    print("Replayed %d frames in %.2f s (%.1f FPS)%s"
+          % (frames, elapsed, frames / elapsed if elapsed else 0.0,
+             '' if replayer.finished else ', stopped by a recorded quit'))
+    summary = summarize(game.profiler)
+    print("%-8s %9s %9s %9s %9s %9s" % ('ms', 'mean', 'p50', 'p95', 'p99', 'max'))
+    for name, stats in summary.items():
+        print("%-8s %9.3f %9.3f %9.3f %9.3f %9.3f"
+              % (name, stats['mean'], stats['p50'], stats['p95'], stats['p99'], stats['max']))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'frames': frames, 'seconds': elapsed, 'timings': summary}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
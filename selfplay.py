@@ -0,0 +1,355 @@
+import argparse
+import json
+import os
+import random
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from board import Board
+from ai import AI
+
+BOARD_ROWS = 6
+BOARD_COLS = 7
+MANIFEST = 'manifest.json'
+
+# Search AIs of the current worker process, one per side and depth, kept
+# between games so their caches carry over within the memory budget
+_players = {}
+
+# Default bytes for the caches of both search AIs of a worker
+DEFAULT_MEMORY_BUDGET = 64 * 2 ** 20
+
+
+def record_dtype(rows=BOARD_ROWS, cols=BOARD_COLS):
+    """Get the record layout of a shard
+    
+    Each record is one position with the player to move about to choose
+    a move. The position is stored as two bit planes (player 1's pieces,
+    then player 2's, row 0 at the top) packed eight cells to a byte.
+    
+    Args:
+        rows (int): Number of rows on the board
+        cols (int): Number of columns on the board
+    
+    Returns:
+        numpy.dtype: Structured dtype with fields position, side, label,
+            result and move
+    """
+    return np.dtype([
+        ('position', np.uint8, ((2 * rows * cols + 7) // 8,)),
+        ('side', np.uint8),     # Player to move (1 or 2)
+        ('label', np.int32),    # Search score, from the side to move's view
+        ('result', np.int8),    # Final game result for the side to move: 1, 0 or -1
+        ('move', np.int8),      # Best column found by the search
+    ])
+
+
+def pack_position(cells):
+    """Pack a position into bit planes
+    
+    Args:
+        cells: 2D array of player numbers (row 0 is the top)
+    
+    Returns:
+        numpy.ndarray: Packed uint8 array, as stored in the position field
+    """
+    planes = np.stack((cells == 1, cells == 2))
+    return np.packbits(planes.ravel())
+
+
+def unpack_positions(packed, rows=BOARD_ROWS, cols=BOARD_COLS):
+    """Unpack the position field of a batch of records
+    
+    Args:
+        packed (numpy.ndarray): Packed positions, shape (n, bytes)
+        rows (int): Number of rows on the board
+        cols (int): Number of columns on the board
+    
+    Returns:
+        numpy.ndarray: uint8 array of shape (n, 2, rows, cols) with a 1 for
+            every piece of player 1 (plane 0) and player 2 (plane 1)
+    """
+    bits = np.unpackbits(packed, axis=-1, count=2 * rows * cols)
+    return bits.reshape(-1, 2, rows, cols)
+
+
+def _get_player(side, depth, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """Get the search AI of this worker process for one side
+    
+    Scores in an AI's caches are relative to its PLAYER, so each side needs
+    its own AI.
+    
+    Args:
+        side (int): Player number (1 or 2)
+        depth (int): Search depth below the root moves
+        memory_budget (int): Bytes for the caches of both sides' AIs
+    
+    Returns:
+        AI: AI searching for the given side
+    """
+    ai = _players.get((side, depth))
+    if ai is None:
+        ai = _players[(side, depth)] = AI(Board(BOARD_ROWS, BOARD_COLS))
+        ai.PLAYER = side
+        ai.OPPONENT = 3 - side
+        ai.SEARCH_DEPTH = depth
+        ai.set_memory_budget(memory_budget // 2)
+    return ai
+
+
+def play_game(seed, depth=4, opening_plies=4, epsilon=0.1,
+              memory_budget=DEFAULT_MEMORY_BUDGET):
+    """Play one self-play game and label every position after the opening
+    
+    Both sides play the hard search. The opening moves are random and,
+    after that, each move is random with probability epsilon, so games
+    cover more than one line of play. Positions are labelled with the
+    search result even when the move actually played was random.
+    
+    Args:
+        seed (int): Random seed of the game
+        depth (int): Search depth below the root moves
+        opening_plies (int): Random moves at the start of the game
+        epsilon (float): Chance of a random move after the opening
+        memory_budget (int): Bytes for the caches of the worker's search
+            AIs, so a worker's memory stays flat however many games it plays
+    
+    Returns:
+        list: (position, side, label, result, move) tuples in game order
+    """
+    rng = random.Random(seed)
+    board = Board(BOARD_ROWS, BOARD_COLS)
+    positions = []
+    winner = 0
+    while True:
+        valid_locations = board.get_valid_locations()
+        side = 1 + len(board.moves) % 2
+        if len(board.moves) < opening_plies:
+            col = rng.choice(valid_locations)
+        else:
+            player = _get_player(side, depth, memory_budget)
+            score, best_col = player.search_scored(board, valid_locations)
+            positions.append((pack_position(board.board), side,
+                              int(max(-2**31, min(2**31 - 1, score))), best_col))
+            col = rng.choice(valid_locations) if rng.random() < epsilon else best_col
+        board.play(col, side)
+        if board.last_move_won():
+            winner = side
+            break
+        if board.is_full():
+            break
+    
+    # Entry sizes are re-measured as the caches fill
+    for side in (1, 2):
+        player = _players.get((side, depth))
+        if player is not None:
+            player.memory_budget.apply(player)
+    
+    records = []
+    for position, side, label, move in positions:
+        result = 0 if not winner else (1 if winner == side else -1)
+        records.append((position, side, label, result, move))
+    return records
+
+
+class ShardWriter:
+    def __init__(self, directory, shard_size=65536, rows=BOARD_ROWS, cols=BOARD_COLS):
+        """Initialize a writer of memory-mapped .npy shards
+        
+        Records go straight into a memory-mapped shard file, so only the
+        records of the game being written are held in memory. The manifest
+        is rewritten whenever a shard fills up, so an interrupted run still
+        leaves a readable dataset.
+        
+        Args:
+            directory (str): Output directory, created if needed
+            shard_size (int): Records per shard
+            rows (int): Number of rows on the board
+            cols (int): Number of columns on the board
+        """
+        self.directory = directory
+        self.shard_size = shard_size
+        self.rows = rows
+        self.cols = cols
+        self.dtype = record_dtype(rows, cols)
+        self.shards = []  # Manifest entries of finished shards
+        self.current = None
+        self.count = 0  # Records in the current shard
+        self.total = 0
+        os.makedirs(directory, exist_ok=True)
+    
+    def _shard_path(self, index):
+        """Get the file name of a shard"""
+        return os.path.join(self.directory, 'shard_%05d.npy' % index)
+    
+    def write(self, records):
+        """Append records, starting new shards as needed
+        
+        Args:
+            records (list): (position, side, label, result, move) tuples
+        """
+        for record in records:
+            if self.current is None:
+                self.current = np.lib.format.open_memmap(
+                    self._shard_path(len(self.shards)), mode='w+',
+                    dtype=self.dtype, shape=(self.shard_size,))
+                self.count = 0
+            self.current[self.count] = record
+            self.count += 1
+            self.total += 1
+            if self.count == self.shard_size:
+                self._finish_shard()
+    
+    def _finish_shard(self):
+        """Flush the current shard and add it to the manifest"""
+        path = self._shard_path(len(self.shards))
+        if self.count < self.shard_size:
+            # Rewrite a partial last shard at its real length; this copies at
+            # most one shard
+            partial = np.lib.format.open_memmap(
+                path + '.tmp', mode='w+', dtype=self.dtype, shape=(self.count,))
+            partial[:] = self.current[:self.count]
+            partial.flush()
+            del partial
+            self.current = None
+            os.replace(path + '.tmp', path)
+        else:
+            self.current.flush()
+            self.current = None
+        self.shards.append({'file': os.path.basename(path), 'count': self.count})
+        self._write_manifest()
+    
+    def _write_manifest(self):
+        """Describe the finished shards and the record layout"""
+        manifest = {
+            'rows': self.rows,
+            'cols': self.cols,
+            'fields': list(self.dtype.names),
+            'shards': self.shards,
+        }
+        path = os.path.join(self.directory, MANIFEST)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + '.tmp', path)
+    
+    def close(self):
+        """Finish the last shard and write the manifest"""
+        if self.current is not None:
+            if self.count:
+                self._finish_shard()
+            else:
+                self.current = None
+                os.remove(self._shard_path(len(self.shards)))
+        self._write_manifest()
+
+
+def generate(directory, games, workers=None, depth=4, opening_plies=4,
+             epsilon=0.1, shard_size=65536, seed=1, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """Play self-play games in parallel and write their positions to shards
+    
+    Args:
+        directory (str): Output directory
+        games (int): Number of games
+        workers (int): Worker processes (default: one per CPU)
+        depth (int): Search depth below the root moves
+        opening_plies (int): Random moves at the start of each game
+        epsilon (float): Chance of a random move after the opening
+        shard_size (int): Records per shard
+        seed (int): Seed of the first game; game i uses seed + i
+        memory_budget (int): Bytes for the search caches of each worker
+    
+    Returns:
+        int: Number of records written
+    """
+    writer = ShardWriter(directory, shard_size)
+    tasks = [(seed + i, depth, opening_plies, epsilon, memory_budget) for i in range(games)]
+    start = time.perf_counter()
+    with Pool(workers) as pool:
+        for finished, records in enumerate(pool.imap_unordered(_play_task, tasks), 1):
+            writer.write(records)
+            if finished % 100 == 0 or finished == games:
+                elapsed = time.perf_counter() - start
+                print("%d/%d games, %d positions, %.1f games/s"
+                      % (finished, games, writer.total, finished / elapsed))
+    writer.close()
+    return writer.total
+
+
+def _play_task(task):
+    """Unpack a task tuple for Pool.imap_unordered"""
+    return play_game(*task)
+
+
+def iter_batches(directory, batch_size=256, seed=None, window=4, unpack=True):
+    """Stream shuffled mini-batches from a self-play dataset
+    
+    Shards are visited in random order, a window of them at a time; the
+    records of the window are drawn in a random order, so batches mix
+    positions from different games and shards while only the rows of the
+    current batch are read from the memory-mapped files.
+    
+    Args:
+        directory (str): Dataset directory written by generate()
+        batch_size (int): Records per batch (the last batch may be smaller)
+        seed (int): Random seed of the shuffle
+        window (int): Shards shuffled together
+        unpack (bool): Unpack positions into (n, 2, rows, cols) bit planes
+    
+    Yields:
+        dict: Arrays keyed by field name (position, side, label, result, move)
+    """
+    with open(os.path.join(directory, MANIFEST)) as f:
+        manifest = json.load(f)
+    rows, cols = manifest['rows'], manifest['cols']
+    rng = np.random.default_rng(seed)
+    shards = manifest['shards']
+    order = rng.permutation(len(shards))
+    
+    for start in range(0, len(order), window):
+        arrays = [np.load(os.path.join(directory, shards[i]['file']), mmap_mode='r')
+                  for i in order[start:start + window]]
+        offsets = np.cumsum([0] + [len(array) for array in arrays])
+        indices = rng.permutation(offsets[-1])
+        for first in range(0, len(indices), batch_size):
+            selected = indices[first:first + batch_size]
+            owner = np.searchsorted(offsets, selected, side='right') - 1
+            batch = np.empty(len(selected), dtype=arrays[0].dtype)
+            for shard, array in enumerate(arrays):
+                slots = np.flatnonzero(owner == shard)
+                if len(slots):
+                    # Read rows in file order, then put them in shuffled order
+                    local = selected[slots] - offsets[shard]
+                    ordered = np.argsort(local)
+                    batch[slots[ordered]] = array[local[ordered]]
+            fields = {name: batch[name] for name in batch.dtype.names}
+            if unpack:
+                fields['position'] = unpack_positions(batch['position'], rows, cols)
+            yield fields
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate Connect 4 self-play training data")
+    parser.add_argument('--out', default='selfplay_data', help="output directory")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--opening-plies', type=int, default=4,
+                        help="random moves at the start of each game")
+    parser.add_argument('--epsilon', type=float, default=0.1,
+                        help="chance of a random move after the opening")
+    parser.add_argument('--shard-size', type=int, default=65536)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--memory-budget', type=float, default=DEFAULT_MEMORY_BUDGET / 2 ** 20,
+                        help="MiB for each worker's search caches")
+    args = parser.parse_args()
+    
+    total = generate(args.out, args.games, args.workers, args.depth, args.opening_plies,
+                     args.epsilon, args.shard_size, args.seed,
+                     int(args.memory_budget * 2 ** 20))
+    print("Wrote %d positions to %s" % (total, args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from board import Board
+from ai import AI
+from analysis_cache import AnalysisCache
+
+BOARD_ROWS = 6
+BOARD_COLS = 7
+
+# Analysis cache of the current worker process, opened on its first search
+_analysis_cache = None
+
+
+def search_move(cells, difficulty, analysis_cache_path=None, memory_budget=None):
+    """Run an AI search in a worker process
+    
+    Args:
+        cells (list): Board cells as nested lists (row 0 is the top row)
+        difficulty (str): Difficulty level ('easy', 'medium', 'hard')
+        analysis_cache_path (str): Analysis cache shared by all workers, if any
+        memory_budget (int): Bytes the search's caches may use, or None
+    
+    Returns:
+        int: Column chosen by the AI
+    """
+    global _analysis_cache
+    board = Board(len(cells), len(cells[0]))
+    board.load(cells)
+    ai = AI(board)
+    ai.set_memory_budget(memory_budget)
+    if analysis_cache_path:
+        if _analysis_cache is None:
+            # Small batches: pool workers exit without flushing
+            _analysis_cache = AnalysisCache(analysis_cache_path, batch_size=8)
+        ai.analysis_cache = _analysis_cache
+    return ai.get_best_move(difficulty)
+
+
+class GameSession:
+    def __init__(self, game_id, difficulty):
+        """Initialize a human-vs-AI game hosted by the server
+        
+        Args:
+            game_id (int): Server-wide identifier of the game
+            difficulty (str): Difficulty level ('easy', 'medium', 'hard')
+        """
+        self.game_id = game_id
+        self.difficulty = difficulty
+        self.board = Board(BOARD_ROWS, BOARD_COLS)
+        self.ai = AI(self.board)
+        self.winner = None
+        self.game_over = False
+    
+    def play(self, col, player):
+        """Drop a piece and update the game state
+        
+        Args:
+            col (int): Column to play
+            player (int): Player number (1 or 2)
+        """
+        row = self.board.get_next_open_row(col)
+        self.board.drop_piece(row, col, player)
+        if self.board.check_win(player):
+            self.winner = player
+            self.game_over = True
+        elif self.board.is_full():
+            self.game_over = True
+    
+    def state(self):
+        """Get the public state of the game
+        
+        Returns:
+            dict: Game id, board cells, winner and game over flag
+        """
+        return {
+            'game': self.game_id,
+            'board': self.board.board.tolist(),
+            'winner': self.winner,
+            'game_over': self.game_over,
+        }
+
+
+class GameServer:
+    """Serve human-vs-AI games over newline-delimited JSON on TCP
+    
+    Each request is one JSON object per line and gets exactly one JSON
+    reply line. Supported operations:
+    
+        {"op": "new", "difficulty": "hard"}    -> start a game
+        {"op": "move", "game": id, "col": 3}   -> human move, then AI reply
+        {"op": "close", "game": id}            -> drop a game
+        {"op": "stats"}                        -> server counters
+    
+    Games belong to the connection that created them and are dropped
+    when it disconnects.
+    """
+    
+    def __init__(self, workers=None, max_pending=None, deadline=2.0, analysis_cache_path=None,
+                 memory_budget=None):
+        """Initialize the server
+        
+        Args:
+            workers (int): Number of search processes (default: CPU count)
+            max_pending (int): Searches allowed in flight before requests
+                are rejected as busy (default: 4 per worker)
+            deadline (float): Seconds a move request may wait for the AI
+            analysis_cache_path (str): Analysis cache file shared by the
+                search processes, or None
+            memory_budget (int): Bytes each search's caches may use, or None
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.deadline = deadline
+        self.analysis_cache_path = analysis_cache_path
+        self.memory_budget = memory_budget
+        self.executor = None
+        self.slots = None
+        self.pending = 0
+        self.games = {}
+        self.next_id = itertools.count(1)
+        self.stats = {
+            'games_started': 0,
+            'moves': 0,
+            'busy': 0,
+            'timeouts': 0,
+        }
+    
+    async def start(self, host='127.0.0.1', port=8765):
+        """Start the worker pool and listen for connections
+        
+        Args:
+            host (str): Interface to bind
+            port (int): TCP port to bind
+        
+        Returns:
+            asyncio.AbstractServer: The listening server
+        """
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.slots = asyncio.Semaphore(self.max_pending)
+        return await asyncio.start_server(self.handle_client, host, port)
+    
+    def close(self):
+        """Shut down the worker pool"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+    
+    async def handle_client(self, reader, writer):
+        """Serve one connection until it closes
+        
+        Args:
+            reader: asyncio.StreamReader for the connection
+            writer: asyncio.StreamWriter for the connection
+        """
+        owned = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    reply = await self.dispatch(request, owned)
+                except (ValueError, KeyError, TypeError) as exc:
+                    reply = {'ok': False, 'error': 'bad request: %s' % exc}
+                writer.write(json.dumps(reply).encode() + b'\n')
+                # Stop reading from this client until its replies drain
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for game_id in owned:
+                self.games.pop(game_id, None)
+            writer.close()
+    
+    async def dispatch(self, request, owned):
+        """Handle a single request
+        
+        Args:
+            request (dict): Decoded request
+            owned (set): Game ids created by the requesting connection
+        
+        Returns:
+            dict: Reply to send back
+        """
+        op = request['op']
+        if op == 'new':
+            difficulty = request.get('difficulty', 'hard')
+            if difficulty not in ('easy', 'medium', 'hard'):
+                return {'ok': False, 'error': 'unknown difficulty'}
+            session = GameSession(next(self.next_id), difficulty)
+            self.games[session.game_id] = session
+            owned.add(session.game_id)
+            self.stats['games_started'] += 1
+            return dict(ok=True, **session.state())
+        if op == 'move':
+            return await self.handle_move(request, owned)
+        if op == 'close':
+            game_id = request['game']
+            owned.discard(game_id)
+            self.games.pop(game_id, None)
+            return {'ok': True}
+        if op == 'stats':
+            return dict(ok=True, games=len(self.games),
+                        pending=self.pending,
+                        **self.stats)
+        return {'ok': False, 'error': 'unknown op'}
+    
+    def release_slot(self):
+        """Return a worker slot to the pool"""
+        self.pending -= 1
+        self.slots.release()
+    
+    async def handle_move(self, request, owned):
+        """Apply a human move and answer with the AI's reply
+        
+        The AI move is searched in the worker pool on a snapshot of the
+        board. If no worker slot frees up before the deadline the request
+        is rejected as busy and the game is left untouched, so the client
+        can retry. If the search itself overruns the deadline the server
+        falls back to a medium-difficulty move.
+        
+        Args:
+            request (dict): Move request with 'game' and 'col'
+            owned (set): Game ids created by the requesting connection
+        
+        Returns:
+            dict: Reply with the AI column and the new game state
+        """
+        game_id = request['game']
+        session = self.games.get(game_id)
+        if session is None or game_id not in owned:
+            return {'ok': False, 'error': 'unknown game'}
+        col = int(request['col'])
+        if session.game_over or not session.board.is_valid_move(col):
+            return {'ok': False, 'error': 'invalid move'}
+        
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            await asyncio.wait_for(self.slots.acquire(), self.deadline)
+        except asyncio.TimeoutError:
+            self.stats['busy'] += 1
+            return {'ok': False, 'error': 'busy'}
+        
+        self.pending += 1
+        self.stats['moves'] += 1
+        session.play(col, 1)
+        if session.game_over:
+            self.release_slot()
+            return dict(ok=True, ai_col=None, **session.state())
+        
+        future = loop.run_in_executor(self.executor, search_move,
+                                      session.board.board.tolist(),
+                                      session.difficulty,
+                                      self.analysis_cache_path,
+                                      self.memory_budget)
+        # The slot is held until the worker is really free again, even
+        # if the client has already been answered with a fallback move
+        future.add_done_callback(lambda _: self.release_slot())
+        remaining = max(0.0, self.deadline - (loop.time() - start))
+        try:
+            ai_col = await asyncio.wait_for(asyncio.shield(future), remaining)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            ai_col = session.ai.get_best_move('medium')
+        
+        if ai_col is not None:
+            session.play(ai_col, 2)
+        return dict(ok=True, ai_col=ai_col, **session.state())
+
+
+async def serve(args):
+    """Run the server until interrupted
+    
+    Args:
+        args: Parsed command line arguments
+    """
+    game_server = GameServer(args.workers, args.max_pending, args.deadline,
+                             args.analysis_cache,
+                             int(args.memory_budget * 2 ** 20) if args.memory_budget else None)
+    server = await game_server.start(args.host, args.port)
+    print("Serving Connect 4 on %s:%d with %d workers"
+          % (args.host, args.port, game_server.workers))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        game_server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Connect 4 AI game server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-pending', type=int, default=None)
+    parser.add_argument('--deadline', type=float, default=2.0,
+                        help="seconds allowed per AI move")
+    parser.add_argument('--analysis-cache', default=None,
+                        help="SQLite file caching hard AI results across workers")
+    parser.add_argument('--memory-budget', type=float, default=None,
+                        help="MiB each search's caches may use")
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+import argparse
+import math
+import multiprocessing
+import queue
+import random
+import sys
+import time
+
+import pygame
+
+from board import Board
+from ai import AI
+
+BOARD_ROWS = 6
+BOARD_COLS = 7
+
+# Colors of ui.UI
+DARK_BLUE = (41, 50, 65)
+NAVY_BLUE = (59, 89, 152)
+BLACK = (0, 0, 0)
+RED = (231, 76, 60)
+YELLOW = (241, 196, 15)
+WHITE = (255, 255, 255)
+GRAY = (189, 195, 199)
+HIGHLIGHTS = {1: (241, 148, 138), 2: (247, 220, 111)}
+PIECE_COLORS = {1: RED, 2: YELLOW}
+
+
+def run_games(events, indices, difficulty, delay, hold, seed, stop_event):
+    """Play AI-vs-AI games on several boards and stream the moves
+    
+    Runs in a separate process. Every sweep plays one move on each running
+    board and sends the sweep's events as one list: ('move', index, col,
+    player), ('over', index, winner) with winner 0 for a draw, and
+    ('reset', index) when a finished board starts a new game.
+    
+    Args:
+        events (multiprocessing.Queue): Queue the event lists are put on
+        indices (list): Board indices played by this runner
+        difficulty (str): Difficulty of both AIs ('easy', 'medium', 'hard')
+        delay (float): Seconds between sweeps
+        hold (float): Seconds a finished game stays on screen
+        seed (int): Random seed
+        stop_event (multiprocessing.Event): Set when the runner must exit
+    """
+    random.seed(seed)
+    boards = {index: Board(BOARD_ROWS, BOARD_COLS) for index in indices}
+    finished = {}  # index -> time the game ended
+    # One AI per side: cached search scores are relative to the AI's player
+    players = {}
+    for side in (1, 2):
+        players[side] = AI(Board(BOARD_ROWS, BOARD_COLS))
+        players[side].PLAYER = side
+        players[side].OPPONENT = 3 - side
+    
+    while not stop_event.is_set():
+        sweep = []
+        now = time.monotonic()
+        for index, board in boards.items():
+            if index in finished:
+                if now - finished[index] >= hold:
+                    del finished[index]
+                    board.reset()
+                    sweep.append(('reset', index))
+                continue
+            
+            side = 1 + len(board.moves) % 2
+            ai = players[side]
+            ai.board = board
+            col = ai.get_best_move(difficulty)
+            board.play(col, side)
+            sweep.append(('move', index, col, side))
+            if board.last_move_won():
+                sweep.append(('over', index, side))
+                finished[index] = now
+            elif board.is_full():
+                sweep.append(('over', index, 0))
+                finished[index] = now
+        events.put(sweep)
+        if delay:
+            time.sleep(delay)
+
+
+class SpectatorView:
+    def __init__(self, screen, count, header=30):
+        """Initialize a grid of small boards
+        
+        Boards are tiled in the grid that leaves them the largest squares.
+        Cells are drawn from sprites that are scaled once from full-size
+        drawings; a move only redraws the cell it filled, and only changed
+        areas are sent to the display.
+        
+        Args:
+            screen: Pygame display surface
+            count (int): Number of boards
+            header (int): Height of the status line at the top
+        """
+        self.screen = screen
+        self.count = count
+        self.header = header
+        width, height = screen.get_size()
+        
+        # Pick the column count that gives the biggest cells
+        best = None
+        for columns in range(1, count + 1):
+            rows = math.ceil(count / columns)
+            tile_w = width // columns
+            tile_h = (height - header) // rows
+            square = min((tile_w - 6) // BOARD_COLS, (tile_h - 6) // BOARD_ROWS)
+            if best is None or square > best[0]:
+                best = (square, columns, tile_w, tile_h)
+        self.square, self.columns, self.tile_w, self.tile_h = best
+        self.square = max(self.square, 2)
+        
+        self.sprites = self._build_sprites(self.square)
+        self.background = self._build_background()
+        self.heights = [[0] * BOARD_COLS for _ in range(count)]
+        self.dirty_rects = []
+        
+        self.moves = 0
+        self.games_finished = 0
+        self.font = pygame.font.Font(None, 22)
+    
+    def _build_sprites(self, square):
+        """Draw the cell sprites at full size and scale them down once
+        
+        Args:
+            square (int): Target cell size in pixels
+        
+        Returns:
+            dict: Opaque cell surfaces for 0 (empty), 1 and 2
+        """
+        size = 80  # ui.UI.SQUARE_SIZE
+        radius = size // 2 - 5
+        center = (size // 2, size // 2)
+        sprites = {}
+        for player in (0, 1, 2):
+            cell = pygame.Surface((size, size))
+            cell.fill(NAVY_BLUE)
+            pygame.draw.circle(cell, BLACK, (center[0] + 2, center[1] + 2), radius)
+            pygame.draw.circle(cell, PIECE_COLORS.get(player, DARK_BLUE), center, radius)
+            if player:
+                pygame.draw.circle(cell, HIGHLIGHTS[player],
+                                   (center[0] - 10, center[1] - 10), radius // 4)
+            sprites[player] = pygame.transform.smoothscale(cell, (square, square))
+        return sprites
+    
+    def _build_background(self):
+        """Build an empty board of scaled cells
+        
+        Returns:
+            pygame.Surface: Empty board the size of a tile's board area
+        """
+        surface = pygame.Surface((self.square * BOARD_COLS, self.square * BOARD_ROWS))
+        for r in range(BOARD_ROWS):
+            for c in range(BOARD_COLS):
+                surface.blit(self.sprites[0], (c * self.square, r * self.square))
+        return surface
+    
+    def board_rect(self, index):
+        """Get the area of a board's cells
+        
+        Args:
+            index (int): Board index
+        
+        Returns:
+            pygame.Rect: Board area, centered in its tile
+        """
+        tile_x = (index % self.columns) * self.tile_w
+        tile_y = self.header + (index // self.columns) * self.tile_h
+        width = self.square * BOARD_COLS
+        height = self.square * BOARD_ROWS
+        return pygame.Rect(tile_x + (self.tile_w - width) // 2,
+                           tile_y + (self.tile_h - height) // 2, width, height)
+    
+    def draw_all(self):
+        """Draw every board empty; used once at startup"""
+        self.screen.fill(DARK_BLUE)
+        for index in range(self.count):
+            self.screen.blit(self.background, self.board_rect(index))
+        self.dirty_rects.append(self.screen.get_rect())
+    
+    def apply(self, event):
+        """Draw the change described by one runner event
+        
+        Args:
+            event (tuple): Event from run_games
+        """
+        kind, index = event[0], event[1]
+        rect = self.board_rect(index)
+        if kind == 'move':
+            col, player = event[2], event[3]
+            height = self.heights[index][col]
+            self.heights[index][col] = height + 1
+            cell = pygame.Rect(rect.x + col * self.square,
+                               rect.y + (BOARD_ROWS - 1 - height) * self.square,
+                               self.square, self.square)
+            self.screen.blit(self.sprites[player], cell)
+            self.dirty_rects.append(cell)
+            self.moves += 1
+        elif kind == 'over':
+            # Frame the finished board in the winner's color
+            color = PIECE_COLORS.get(event[2], WHITE)
+            frame = rect.inflate(4, 4)
+            pygame.draw.rect(self.screen, color, frame, 2)
+            self.dirty_rects.append(frame)
+            self.games_finished += 1
+        elif kind == 'reset':
+            frame = rect.inflate(4, 4)
+            pygame.draw.rect(self.screen, DARK_BLUE, frame, 2)
+            self.screen.blit(self.background, rect)
+            self.heights[index] = [0] * BOARD_COLS
+            self.dirty_rects.append(frame)
+    
+    def draw_status(self, fps):
+        """Draw the status line
+        
+        Args:
+            fps (float): Measured frame rate
+        """
+        area = pygame.Rect(0, 0, self.screen.get_width(), self.header)
+        self.screen.fill(DARK_BLUE, area)
+        text = "%d boards   %d moves   %d games finished   %.0f FPS" % (
+            self.count, self.moves, self.games_finished, fps)
+        self.screen.blit(self.font.render(text, True, GRAY), (10, 8))
+        self.dirty_rects.append(area)
+    
+    def present(self):
+        """Send the changed areas to the display"""
+        if len(self.dirty_rects) > 256:
+            # After a burst of moves one full update is cheaper
+            pygame.display.update()
+        elif self.dirty_rects:
+            pygame.display.update(self.dirty_rects)
+        self.dirty_rects = []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch many AI-vs-AI Connect 4 games at once")
+    parser.add_argument('--boards', type=int, default=64)
+    parser.add_argument('--difficulty', default='medium', choices=['easy', 'medium', 'hard'])
+    parser.add_argument('--runners', type=int, default=1,
+                        help="processes playing the games")
+    parser.add_argument('--delay', type=float, default=0.05,
+                        help="seconds between moves on each board")
+    parser.add_argument('--hold', type=float, default=1.5,
+                        help="seconds a finished game stays on screen")
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=800)
+    parser.add_argument('--seconds', type=float, default=None,
+                        help="exit after this long and print frame statistics")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_caption("Connect 4 - Spectator")
+    screen = pygame.display.set_mode((args.width, args.height))
+    view = SpectatorView(screen, args.boards)
+    view.draw_all()
+    view.present()
+    
+    events = multiprocessing.Queue()
+    stop_event = multiprocessing.Event()
+    runners = []
+    for i in range(args.runners):
+        runner = multiprocessing.Process(
+            target=run_games, daemon=True,
+            args=(events, list(range(i, args.boards, args.runners)), args.difficulty,
+                  args.delay, args.hold, args.seed + i, stop_event))
+        runner.start()
+        runners.append(runner)
+    
+    clock = pygame.time.Clock()
+    frame_times = []
+    start = time.perf_counter()
+    last_status = 0.0
+    running = True
+    while running:
+        clock.tick(60)
+        frame_start = time.perf_counter()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and
+                                             event.key == pygame.K_ESCAPE):
+                running = False
+        
+        # Apply every sweep that arrived since the last frame
+        while True:
+            try:
+                sweep = events.get_nowait()
+            except queue.Empty:
+                break
+            for event in sweep:
+                view.apply(event)
+        
+        if frame_start - last_status >= 0.5:
+            view.draw_status(clock.get_fps())
+            last_status = frame_start
+        view.present()
+        frame_times.append(time.perf_counter() - frame_start)
+        
+        if args.seconds is not None and frame_start - start >= args.seconds:
+            running = False
+    
+    stop_event.set()
+    for runner in runners:
+        runner.join(1.0)
+        if runner.is_alive():
+            runner.terminate()
+    
+    if args.seconds is not None:
+        frame_times.sort()
+        print("%d frames, %.1f FPS, frame work mean %.3f ms, p99 %.3f ms, %d moves, %d games"
+              % (len(frame_times), len(frame_times) / (time.perf_counter() - start),
+                 sum(frame_times) / len(frame_times) * 1000,
+                 frame_times[int(len(frame_times) * 0.99)] * 1000,
+                 view.moves, view.games_finished))
+    pygame.quit()
+    sys.exit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+_masks = {}
+
+
+def _board_masks(rows, cols):
+    """Get the bitboard masks for a board size
+    
+    Args:
+        rows (int): Number of rows
+        cols (int): Number of columns
+    
+    Returns:
+        tuple: (bottom, full) where bottom has the lowest cell of every
+            column set and full has every cell of the board set
+    """
+    masks = _masks.get((rows, cols))
+    if masks is None:
+        bottom = 0
+        for c in range(cols):
+            bottom |= 1 << (c * (rows + 1))
+        masks = _masks[(rows, cols)] = (bottom, bottom * ((1 << rows) - 1))
+    return masks
+
+
+def winning_cells(position, rows):
+    """Find every cell that would complete a line of four
+    
+    Args:
+        position (int): Bitboard of one player's pieces
+        rows (int): Number of rows on the board
+    
+    Returns:
+        int: Bitboard of cells (occupied or not) that finish a four for the player
+    """
+    h = rows + 1
+    # Vertical lines can only be completed on top
+    cells = (position << 1) & (position << 2) & (position << 3)
+    # Horizontal, then both diagonals; the gap can be at any of the 4 cells
+    for shift in (h, h - 1, h + 1):
+        pair = (position << shift) & (position << 2 * shift)
+        cells |= pair & (position << 3 * shift)
+        cells |= pair & (position >> shift)
+        pair = (position >> shift) & (position >> 2 * shift)
+        cells |= pair & (position << shift)
+        cells |= pair & (position >> 3 * shift)
+    return cells
+
+
+def bit_columns(bits, rows, cols):
+    """List the columns that contain at least one set bit
+    
+    Args:
+        bits (int): Bitboard
+        rows (int): Number of rows on the board
+        cols (int): Number of columns on the board
+    
+    Returns:
+        list: Column indices in increasing order
+    """
+    column_mask = (1 << (rows + 1)) - 1
+    return [c for c in range(cols) if (bits >> (c * (rows + 1))) & column_mask]
+
+
+class ThreatInfo:
+    def __init__(self, board):
+        """Analyze the tactical threats of both players in a position
+        
+        Attributes:
+            threats (list): Per player, bitboard of empty cells that would
+                complete a four for that player
+            playable (int): Bitboard of the next open cell of every column
+            wins (list): Per player, columns that win immediately
+            double_threat (list): Per player, True if the player has two
+                immediate wins, or two winning cells stacked on top of each
+                other, so one block cannot stop them
+            poisoned (list): Per player, columns where a move would let the
+                opponent win directly above it
+        
+        Lists are indexed by player number (index 0 unused).
+        
+        Args:
+            board: Board object to analyze
+        """
+        rows, cols = board.rows, board.cols
+        bottom, full = _board_masks(rows, cols)
+        empty = full & ~board.mask
+        self.rows = rows
+        self.cols = cols
+        self.playable = (board.mask + bottom) & full
+        self.threats = [0,
+                        winning_cells(board.bitboards[1], rows) & empty,
+                        winning_cells(board.bitboards[2], rows) & empty]
+        self.wins = [None]
+        self.double_threat = [None]
+        self.poisoned = [None]
+        for player in (1, 2):
+            threats = self.threats[player]
+            immediate = threats & self.playable
+            wins = bit_columns(immediate, rows, cols)
+            self.wins.append(wins)
+            self.double_threat.append(len(wins) > 1 or bool(immediate & (threats >> 1)))
+            # A move that wins on the spot never gives the opponent a turn
+            quiet = self.playable & ~immediate
+            self.poisoned.append(bit_columns((quiet << 1) & self.threats[3 - player], rows, cols))
+    
+    def safe_moves(self, player, valid_locations):
+        """Filter moves down to the ones that do not lose on the spot
+        
+        If the opponent has an immediate win, the only move worth looking at
+        is blocking it; otherwise moves under an opponent's winning cell are
+        dropped. When every move loses, all of them are returned.
+        
+        Args:
+            player (int): Player to move
+            valid_locations (list): Columns that are not full
+        
+        Returns:
+            list: Subset of valid_locations, in the same order
+        """
+        opponent_wins = self.wins[3 - player]
+        if opponent_wins:
+            if len(opponent_wins) > 1:
+                return valid_locations
+            return opponent_wins
+        poisoned = self.poisoned[player]
+        if not poisoned:
+            return valid_locations
+        safe = [col for col in valid_locations if col not in poisoned]
+        return safe or valid_locations
+
+
+def analyze(board):
+    """Analyze the tactical threats of both players in a position
+    
+    Args:
+        board: Board object to analyze
+    
+    Returns:
+        ThreatInfo: Threat analysis of the position
+    """
+    return ThreatInfo(board)
@@ -0,0 +1,158 @@
+import time
+
+
+def format_clock(seconds):
+    """Format a clock reading, with tenths of a second when time is short
+    
+    Args:
+        seconds (float): Seconds left
+    
+    Returns:
+        str: 'm:ss', or 'm:ss.t' under 20 seconds
+    """
+    seconds = max(0.0, seconds)
+    if seconds < 20:
+        tenths = int(seconds * 10)
+        return '%d:%02d.%d' % (tenths // 600, tenths // 10 % 60, tenths % 10)
+    whole = int(seconds)
+    return '%d:%02d' % (whole // 60, whole % 60)
+
+
+class GameClock:
+    def __init__(self, initial, increment=0.0):
+        """Initialize a chess-style clock for two players
+        
+        Only the clock of the player to move runs. A player who finishes a
+        move gets the increment added to their clock (Fischer increment).
+        
+        Args:
+            initial (float): Seconds each player starts with
+            increment (float): Seconds added after every move
+        """
+        self.initial = initial
+        self.increment = increment
+        self.reset()
+    
+    def reset(self):
+        """Give both players their initial time and stop the clock"""
+        self.remaining = {1: float(self.initial), 2: float(self.initial)}
+        self.running = None  # Player whose clock runs
+        self.started = 0.0
+    
+    def start(self, player):
+        """Start a player's clock, stopping the other one
+        
+        Args:
+            player (int): Player to move (1 or 2)
+        """
+        self.stop()
+        self.running = player
+        self.started = time.monotonic()
+    
+    def stop(self):
+        """Stop the running clock without adding the increment"""
+        if self.running is not None:
+            self.remaining[self.running] -= time.monotonic() - self.started
+            self.running = None
+    
+    def press(self):
+        """Stop the running clock after its player moved and add the increment"""
+        player = self.running
+        self.stop()
+        if player is not None and self.remaining[player] > 0:
+            self.remaining[player] += self.increment
+    
+    def time_left(self, player):
+        """Get a player's time left, counting the running clock up to now
+        
+        Args:
+            player (int): Player (1 or 2)
+        
+        Returns:
+            float: Seconds left, negative once the player has flagged
+        """
+        left = self.remaining[player]
+        if player == self.running:
+            left -= time.monotonic() - self.started
+        return left
+    
+    def flagged(self):
+        """Get the player who ran out of time
+        
+        Returns:
+            int: Player whose time is up, or None
+        """
+        for player in (1, 2):
+            if self.time_left(player) <= 0:
+                return player
+        return None
+
+
+class TimeManager:
+    def __init__(self, overhead=0.05, min_moves_left=4, max_share=0.25, book_depth=8):
+        """Initialize the split of the AI's clock into per-move budgets
+        
+        The time left is divided by the moves the AI still expects to make,
+        weighted by game phase: openings are cheap to play, and the
+        midgame, where most Connect 4 games are decided, gets the most time.
+        Most of the increment is spent on every move, since it comes back
+        after the move.
+        
+        Args:
+            overhead (float): Seconds kept back per move for drawing and
+                event handling around the search
+            min_moves_left (int): Fewest moves the AI plans for
+            max_share (float): Largest fraction of the time left one move's
+                target may use
+            book_depth (int): Cached results at least this deep are played
+                without searching
+        """
+        self.overhead = overhead
+        self.min_moves_left = min_moves_left
+        self.max_share = max_share
+        self.book_depth = book_depth
+    
+    def phase_weight(self, ply, cells):
+        """Get the share of the average budget a move gets in its game phase
+        
+        Args:
+            ply (int): Moves played so far
+            cells (int): Cells on the board
+        
+        Returns:
+            float: Multiplier for the average per-move budget
+        """
+        progress = ply / cells
+        if progress < 0.15:
+            return 0.5  # Opening
+        if progress < 0.6:
+            return 1.6  # Midgame
+        return 1.0  # Endgame, where the search tree shrinks on its own
+    
+    def allocate(self, time_left, increment, ply, cells):
+        """Split the time left into a budget for the next move
+        
+        Args:
+            time_left (float): Seconds left on the AI's clock
+            increment (float): Seconds added after the move
+            ply (int): Moves played so far
+            cells (int): Cells on the board
+        
+        Returns:
+            tuple: (soft, hard) seconds from now; no deeper search starts
+                after soft, and the search is aborted at hard, which always
+                leaves time on the clock
+        """
+        usable = time_left - self.overhead
+        if usable <= 0:
+            return 0.0, 0.0
+        
+        # Games rarely fill the board; plan for a typical length
+        expected_plies = int(cells * 0.85)
+        moves_left = max(self.min_moves_left, (expected_plies - ply) // 2)
+        target = usable / moves_left * self.phase_weight(ply, cells) + increment * 0.9
+        target = min(target, usable * self.max_share)
+        
+        # A deeper iteration usually takes longer than all earlier ones
+        # together, so none is started past half the target
+        return target * 0.5, min(target * 2, usable * 0.5)
@@ -1,5 +1,68 @@
+import json
+import os
 import pygame
 import numpy as np
+from compositor import Compositor
+
+# Resolved system font paths, persisted so later launches skip the font scan
+FONT_CACHE_PATH = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')),
+    'connect4-pygame', 'fonts.json')
+
+_font_paths = None
+_fonts = {}
+
+
+def resolve_font(name):
+    """Find the file for a system font, using the on-disk font cache
+    
+    Args:
+        name (str): System font name
+    
+    Returns:
+        str: Path to the font file, or None to use pygame's default font
+    """
+    global _font_paths
+    if _font_paths is None:
+        try:
+            with open(FONT_CACHE_PATH) as f:
+                _font_paths = json.load(f)
+        except (OSError, ValueError):
+            _font_paths = {}
+    
+    path = _font_paths.get(name, '')
+    if path is None or (path and os.path.exists(path)):
+        return path
+    
+    # Cache miss: this is the slow system font scan that SysFont would do
+    path = pygame.font.match_font(name)
+    _font_paths[name] = path
+    try:
+        os.makedirs(os.path.dirname(FONT_CACHE_PATH), exist_ok=True)
+        with open(FONT_CACHE_PATH, 'w') as f:
+            json.dump(_font_paths, f)
+    except OSError:
+        pass
+    return path
+
+
+def load_font(name, size):
+    """Load a system font once per name and size
+    
+    Args:
+        name (str): System font name
+        size (int): Font size
+    
+    Returns:
+        pygame.font.Font: The loaded font
+    """
+    key = (name, size)
+    if key not in _fonts:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        _fonts[key] = pygame.font.Font(resolve_font(name), size)
+    return _fonts[key]
+
 
 class UI:
     def __init__(self, screen, width, height):
@@ -38,85 +101,113 @@ class UI:
         self.board_x = (self.width - self.board_width) // 2
         self.board_y = (self.height - self.board_height) // 2
         
-        # Fonts
-        pygame.font.init()
-        self.font = pygame.font.SysFont('Arial', 30)
-        self.large_font = pygame.font.SysFont('Arial', 50)
-        self.small_font = pygame.font.SysFont('Arial', 20)
+        # Fonts, the board background and the game over overlay are built
+        # on first use
+        self._board_surface = None
+        self._game_over_overlay = None
+        self.compositor = Compositor(screen)
+        
+        # Source of the mouse position; benchmarks and replays swap in
+        # scripted positions
+        self.get_mouse_pos = pygame.mouse.get_pos
         
         # UI state
         self.selected_difficulty = 'medium'  # Default difficulty
     
-    def draw_menu(self):
-        """Draw the main menu
+    @property
+    def font(self):
+        return load_font('Arial', 30)
+    
+    @property
+    def large_font(self):
+        return load_font('Arial', 50)
+    
+    @property
+    def small_font(self):
+        return load_font('Arial', 20)
+    
+    @property
+    def board_surface(self):
+        """Navy board background, created on first use"""
+        if self._board_surface is None:
+            self._board_surface = pygame.Surface((self.board_width, self.board_height - self.SQUARE_SIZE))
+            self._board_surface.fill(self.NAVY_BLUE)
+        return self._board_surface
+    
+    def _draw_button(self, surface, rect, color, label, font, border_radius):
+        """Draw a rounded button with a white border and centered label
+        
+        Args:
+            surface: Pygame surface to draw on
+            rect (pygame.Rect): Button area
+            color (tuple): Fill color
+            label (str): Button text
+            font: Font for the label
+            border_radius (int): Corner radius
+        """
+        pygame.draw.rect(surface, color, rect, border_radius=border_radius)
+        pygame.draw.rect(surface, self.WHITE, rect, 2, border_radius=border_radius)
+        text = font.render(label, True, self.WHITE)
+        surface.blit(text, text.get_rect(center=rect.center))
+    
+    def _menu_buttons(self):
+        """Get the main menu buttons
         
         Returns:
-            str: The menu option that the mouse is hovering over
+            list: (choice, rect, label) tuples from top to bottom
         """
-        self.screen.fill(self.DARK_BLUE)
+        return [
+            ("pvp", pygame.Rect(self.width//2 - 150, 200, 300, 60), 'Player vs Player'),
+            ("ai", pygame.Rect(self.width//2 - 150, 280, 300, 60), 'Player vs AI'),
+            ("settings", pygame.Rect(self.width//2 - 150, 360, 300, 60), 'Settings'),
+            ("quit", pygame.Rect(self.width//2 - 150, 440, 300, 60), 'Quit'),
+        ]
+    
+    def _build_menu(self, surface):
+        """Draw the main menu with no button hovered
+        
+        Args:
+            surface: Pygame surface to draw on
+        """
+        surface.fill(self.DARK_BLUE)
         
         # Title with shadow effect
         title_shadow = self.large_font.render('CONNECT 4', True, self.BLACK)
         title = self.large_font.render('CONNECT 4', True, self.LIGHT_BLUE)
         title_rect = title.get_rect(center=(self.width//2, 100))
-        self.screen.blit(title_shadow, (title_rect.x + 2, title_rect.y + 2))
-        self.screen.blit(title, title_rect)
-        
-        # Menu options
-        mouse_pos = pygame.mouse.get_pos()
-        
-        # PvP button
-        pvp_rect = pygame.Rect(self.width//2 - 150, 200, 300, 60)
-        pvp_color = self.LIGHT_BLUE if pvp_rect.collidepoint(mouse_pos) else self.DARK_GRAY
-        pygame.draw.rect(self.screen, pvp_color, pvp_rect, border_radius=10)
-        pygame.draw.rect(self.screen, self.WHITE, pvp_rect, 2, border_radius=10)
-        pvp_text = self.font.render('Player vs Player', True, self.WHITE)
-        pvp_text_rect = pvp_text.get_rect(center=pvp_rect.center)
-        self.screen.blit(pvp_text, pvp_text_rect)
-        
-        # AI button
-        ai_rect = pygame.Rect(self.width//2 - 150, 280, 300, 60)
-        ai_color = self.LIGHT_BLUE if ai_rect.collidepoint(mouse_pos) else self.DARK_GRAY
-        pygame.draw.rect(self.screen, ai_color, ai_rect, border_radius=10)
-        pygame.draw.rect(self.screen, self.WHITE, ai_rect, 2, border_radius=10)
-        ai_text = self.font.render('Player vs AI', True, self.WHITE)
-        ai_text_rect = ai_text.get_rect(center=ai_rect.center)
-        self.screen.blit(ai_text, ai_text_rect)
-        
-        # Settings button
-        settings_rect = pygame.Rect(self.width//2 - 150, 360, 300, 60)
-        settings_color = self.LIGHT_BLUE if settings_rect.collidepoint(mouse_pos) else self.DARK_GRAY
-        pygame.draw.rect(self.screen, settings_color, settings_rect, border_radius=10)
-        pygame.draw.rect(self.screen, self.WHITE, settings_rect, 2, border_radius=10)
-        settings_text = self.font.render('Settings', True, self.WHITE)
-        settings_text_rect = settings_text.get_rect(center=settings_rect.center)
-        self.screen.blit(settings_text, settings_text_rect)
-        
-        # Quit button
-        quit_rect = pygame.Rect(self.width//2 - 150, 440, 300, 60)
-        quit_color = self.LIGHT_BLUE if quit_rect.collidepoint(mouse_pos) else self.DARK_GRAY
-        pygame.draw.rect(self.screen, quit_color, quit_rect, border_radius=10)
-        pygame.draw.rect(self.screen, self.WHITE, quit_rect, 2, border_radius=10)
-        quit_text = self.font.render('Quit', True, self.WHITE)
-        quit_text_rect = quit_text.get_rect(center=quit_rect.center)
-        self.screen.blit(quit_text, quit_text_rect)
+        surface.blit(title_shadow, (title_rect.x + 2, title_rect.y + 2))
+        surface.blit(title, title_rect)
+        
+        for _, rect, label in self._menu_buttons():
+            self._draw_button(surface, rect, self.DARK_GRAY, label, self.font, 10)
         
         # Version info
         version_text = self.small_font.render('v1.1.0', True, self.GRAY)
-        self.screen.blit(version_text, (10, self.height - 30))
+        surface.blit(version_text, (10, self.height - 30))
+    
+    def draw_menu(self):
+        """Draw the main menu
         
-        pygame.display.update()
+        The menu without hover is cached; only the hovered button is drawn
+        on top of it, and nothing is drawn while the hover does not change.
+        
+        Returns:
+            str: The menu option that the mouse is hovering over
+        """
+        mouse_pos = self.get_mouse_pos()
+        hovered = None
+        for choice, rect, label in self._menu_buttons():
+            if rect.collidepoint(mouse_pos):
+                hovered = (choice, rect, label)
+                break
+        
+        if self.compositor.needs_redraw(('menu', hovered and hovered[0])):
+            self.screen.blit(self.compositor.layer(('menu',), self._build_menu), (0, 0))
+            if hovered is not None:
+                self._draw_button(self.screen, hovered[1], self.LIGHT_BLUE, hovered[2], self.font, 10)
         
         # Return which button is being hovered
-        if pvp_rect.collidepoint(mouse_pos):
-            return "pvp"
-        elif ai_rect.collidepoint(mouse_pos):
-            return "ai"
-        elif settings_rect.collidepoint(mouse_pos):
-            return "settings"
-        elif quit_rect.collidepoint(mouse_pos):
-            return "quit"
-        return None
+        return hovered and hovered[0]
     
     def draw_board(self, board, current_player):
         """Draw the game board
@@ -128,9 +219,7 @@ class UI:
         self.screen.fill(self.DARK_BLUE)
         
         # Draw the board background with rounded corners
-        board_surface = pygame.Surface((self.board_width, self.board_height - self.SQUARE_SIZE))
-        board_surface.fill(self.NAVY_BLUE)
-        self.screen.blit(board_surface, (self.board_x, self.board_y + self.SQUARE_SIZE))
+        self.screen.blit(self.board_surface, (self.board_x, self.board_y + self.SQUARE_SIZE))
         
         # Draw the pieces
         for r in range(self.BOARD_ROWS):
@@ -158,7 +247,7 @@ class UI:
                     pygame.draw.circle(self.screen, (247, 220, 111), (x-10, y-10), self.RADIUS//4)
         
         # Draw the piece preview
-        if pygame.mouse.get_pos()[1] < self.board_y + self.SQUARE_SIZE:
+        if self.get_mouse_pos()[1] < self.board_y + self.SQUARE_SIZE:
             col = self.get_column_from_mouse()
             if col is not None:
                 x = self.board_x + col * self.SQUARE_SIZE + self.SQUARE_SIZE // 2
@@ -177,24 +266,87 @@ class UI:
         self.screen.blit(player_indicator, player_rect)
         
         # Draw back button at the bottom with fixed position
-        back_rect = pygame.Rect(self.width//2 - 50, self.height - 60, 100, 40)
-        mouse_pos = pygame.mouse.get_pos()
+        back_rect = self._back_rect()
+        mouse_pos = self.get_mouse_pos()
         back_color = self.LIGHT_BLUE if back_rect.collidepoint(mouse_pos) else self.DARK_GRAY
-        pygame.draw.rect(self.screen, back_color, back_rect, border_radius=8)
-        pygame.draw.rect(self.screen, self.WHITE, back_rect, 2, border_radius=8)
-        back_text = self.small_font.render('Menu', True, self.WHITE)
-        back_text_rect = back_text.get_rect(center=back_rect.center)
-        self.screen.blit(back_text, back_text_rect)
+        self._draw_button(self.screen, back_rect, back_color, 'Menu', self.small_font, 8)
         
         self.back_rect = back_rect
     
+    def draw_analysis(self, scores, depth):
+        """Draw the analysis score of each column above the board
+        
+        Args:
+            scores (dict): Column to (score, depth), from the point of view
+                of the player to move
+            depth (int): Depth finished for every column
+        """
+        best = max(score for score, _ in scores.values()) if scores else None
+        for col, (score, _) in scores.items():
+            if score >= 100000:
+                label = 'WIN'
+            elif score <= -100000:
+                label = 'LOSS'
+            else:
+                label = '%+d' % score
+            color = self.GREEN if score == best else self.WHITE
+            text = self.small_font.render(label, True, color)
+            x = self.board_x + col * self.SQUARE_SIZE + self.SQUARE_SIZE // 2
+            self.screen.blit(text, text.get_rect(center=(x, self.board_y - 8)))
+        
+        depth_text = self.small_font.render('depth %d' % depth, True, self.GRAY)
+        self.screen.blit(depth_text, depth_text.get_rect(topright=(self.width - 10, 10)))
+    
+    def _clock_rects(self):
+        """Get the areas of the players' clocks, beside the menu button
+        
+        Returns:
+            tuple: (player 1 rect, player 2 rect)
+        """
+        return (pygame.Rect(self.board_x, self.height - 60, 180, 40),
+                pygame.Rect(self.board_x + self.board_width - 180, self.height - 60, 180, 40))
+    
+    def draw_clocks(self, running, texts):
+        """Draw both players' game clocks
+        
+        The clock areas are cleared first, so the clocks can be redrawn over
+        an unchanged frame.
+        
+        Args:
+            running (int): Player whose clock runs, or None
+            texts (tuple): Formatted time left of player 1 and player 2
+        
+        Returns:
+            list: Areas drawn
+        """
+        rects = []
+        for player, rect, text in zip((1, 2), self._clock_rects(), texts):
+            self.screen.fill(self.DARK_BLUE, rect)
+            name = 'Red' if player == 1 else 'Yellow'
+            if player == running:
+                color = self.RED if player == 1 else self.YELLOW
+            else:
+                color = self.GRAY
+            label = self.font.render('%s %s' % (name, text), True, color)
+            self.screen.blit(label, label.get_rect(center=rect.center))
+            rects.append(rect)
+        return rects
+    
+    def _back_rect(self):
+        """Get the menu button of the game screen
+        
+        Returns:
+            pygame.Rect: Button area
+        """
+        return pygame.Rect(self.width//2 - 50, self.height - 60, 100, 40)
+    
     def get_column_from_mouse(self):
         """Get the column index from mouse position
         
         Returns:
             int: Column index or None if mouse is outside the board
         """
-        mouse_x = pygame.mouse.get_pos()[0]
+        mouse_x = self.get_mouse_pos()[0]
         
         # Check if mouse is within board boundaries
         if mouse_x < self.board_x or mouse_x > self.board_x + self.board_width:
@@ -208,33 +360,58 @@ class UI:
             return col
         return None
     
-    def draw_game_over(self, player1_win, player2_win, draw):
+    def _game_over_rects(self):
+        """Get the game over buttons
+        
+        Returns:
+            tuple: (play_again_rect, menu_rect)
+        """
+        panel_y = (self.height - 300) // 2
+        return (pygame.Rect(self.width//2 - 120, panel_y + 120, 240, 50),
+                pygame.Rect(self.width//2 - 120, panel_y + 190, 240, 50))
+    
+    def game_hover_key(self):
+        """Describe everything the mouse changes on the game screen
+        
+        Returns:
+            tuple: Previewed column, then whether the menu, play again and
+                main menu buttons are hovered
+        """
+        mouse_pos = self.get_mouse_pos()
+        preview = None
+        if mouse_pos[1] < self.board_y + self.SQUARE_SIZE:
+            preview = self.get_column_from_mouse()
+        play_again_rect, menu_rect = self._game_over_rects()
+        return (preview, self._back_rect().collidepoint(mouse_pos),
+                play_again_rect.collidepoint(mouse_pos), menu_rect.collidepoint(mouse_pos))
+    
+    def draw_game_over(self, player1_win, player2_win, draw, flagged=None):
         """Draw the game over screen
         
         Args:
             player1_win (bool): True if player 1 won
             player2_win (bool): True if player 2 won
             draw (bool): True if the game ended in a draw
+            flagged (int): Player who lost on time, or None
         """
-        overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))  # Semi-transparent black
-        self.screen.blit(overlay, (0, 0))
+        # The semi-transparent black overlay never changes, so it is built once
+        if self._game_over_overlay is None:
+            self._game_over_overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+            self._game_over_overlay.fill((0, 0, 0, 180))
+        self.screen.blit(self._game_over_overlay, (0, 0))
         
         # Game over panel
-        panel_width, panel_height = 400, 300
-        panel_x = (self.width - panel_width) // 2
+        panel_height = 300
         panel_y = (self.height - panel_height) // 2
         
-        # Draw panel background with rounded corners
-        pygame.draw.rect(overlay, self.DARK_GRAY, 
-                         (panel_x, panel_y, panel_width, panel_height), 
-                         border_radius=15)
-        pygame.draw.rect(overlay, self.WHITE, 
-                         (panel_x, panel_y, panel_width, panel_height), 
-                         2, border_radius=15)
-        
         # Game over message
-        if player1_win:
+        if flagged == 2:
+            message = "Red Wins on Time!"
+            color = self.RED
+        elif flagged == 1:
+            message = "Yellow Wins on Time!"
+            color = self.YELLOW
+        elif player1_win:
             message = "Red Player Wins!"
             color = self.RED
         elif player2_win:
@@ -248,24 +425,13 @@ class UI:
         text_rect = text.get_rect(center=(self.width//2, panel_y + 60))
         self.screen.blit(text, text_rect)
         
-        # Play again button
-        play_again_rect = pygame.Rect(self.width//2 - 120, panel_y + 120, 240, 50)
-        mouse_pos = pygame.mouse.get_pos()
+        # Play again and main menu buttons
+        play_again_rect, menu_rect = self._game_over_rects()
+        mouse_pos = self.get_mouse_pos()
         play_again_color = self.LIGHT_BLUE if play_again_rect.collidepoint(mouse_pos) else self.DARK_GRAY
-        pygame.draw.rect(self.screen, play_again_color, play_again_rect, border_radius=10)
-        pygame.draw.rect(self.screen, self.WHITE, play_again_rect, 2, border_radius=10)
-        play_again_text = self.font.render('Play Again', True, self.WHITE)
-        play_again_text_rect = play_again_text.get_rect(center=play_again_rect.center)
-        self.screen.blit(play_again_text, play_again_text_rect)
-        
-        # Main menu button
-        menu_rect = pygame.Rect(self.width//2 - 120, panel_y + 190, 240, 50)
+        self._draw_button(self.screen, play_again_rect, play_again_color, 'Play Again', self.font, 10)
         menu_color = self.LIGHT_BLUE if menu_rect.collidepoint(mouse_pos) else self.DARK_GRAY
-        pygame.draw.rect(self.screen, menu_color, menu_rect, border_radius=10)
-        pygame.draw.rect(self.screen, self.WHITE, menu_rect, 2, border_radius=10)
-        menu_text = self.font.render('Main Menu', True, self.WHITE)
-        menu_text_rect = menu_text.get_rect(center=menu_rect.center)
-        self.screen.blit(menu_text, menu_text_rect)
+        self._draw_button(self.screen, menu_rect, menu_color, 'Main Menu', self.font, 10)
         
         self.play_again_rect = play_again_rect
         self.menu_rect = menu_rect
@@ -277,7 +443,7 @@ class UI:
             bool: True if the play again button is clicked
         """
         if hasattr(self, 'play_again_rect'):
-            return self.play_again_rect.collidepoint(pygame.mouse.get_pos())
+            return self.play_again_rect.collidepoint(self.get_mouse_pos())
         return False
     
     def is_menu_clicked(self):
@@ -287,76 +453,76 @@ class UI:
             bool: True if the menu button is clicked
         """
         if hasattr(self, 'menu_rect'):
-            return self.menu_rect.collidepoint(pygame.mouse.get_pos())
+            return self.menu_rect.collidepoint(self.get_mouse_pos())
         return False
-    def draw_settings(self):
-        """Draw the settings menu
+    def _settings_buttons(self):
+        """Get the settings buttons
         
         Returns:
-            tuple: (action, value) where action is the selected action and value is the selected option
+            list: (name, rect, label) tuples; the difficulty buttons come
+                first, named after their difficulty
         """
-        self.screen.fill(self.DARK_BLUE)
+        return [
+            ('easy', pygame.Rect(self.width//2 - 250, 250, 150, 50), 'Easy'),
+            ('medium', pygame.Rect(self.width//2 - 75, 250, 150, 50), 'Medium'),
+            ('hard', pygame.Rect(self.width//2 + 100, 250, 150, 50), 'Hard'),
+            ('back', pygame.Rect(self.width//2 - 150, 400, 300, 60), 'Back to Menu'),
+        ]
+    
+    def _build_settings(self, surface):
+        """Draw the settings menu with no button hovered
+        
+        Args:
+            surface: Pygame surface to draw on
+        """
+        surface.fill(self.DARK_BLUE)
         
         # Title
         title = self.large_font.render('SETTINGS', True, self.LIGHT_BLUE)
         title_rect = title.get_rect(center=(self.width//2, 100))
-        self.screen.blit(title, title_rect)
-        
-        mouse_pos = pygame.mouse.get_pos()
+        surface.blit(title, title_rect)
         
         # Difficulty selection
         difficulty_label = self.font.render('AI Difficulty:', True, self.WHITE)
-        self.screen.blit(difficulty_label, (self.width//2 - 250, 200))
-        
-        # Easy button
-        easy_rect = pygame.Rect(self.width//2 - 250, 250, 150, 50)
-        easy_color = self.GREEN if self.selected_difficulty == 'easy' else self.DARK_GRAY
-        if easy_rect.collidepoint(mouse_pos):
-            easy_color = self.LIGHT_BLUE
-        pygame.draw.rect(self.screen, easy_color, easy_rect, border_radius=8)
-        pygame.draw.rect(self.screen, self.WHITE, easy_rect, 2, border_radius=8)
-        easy_text = self.font.render('Easy', True, self.WHITE)
-        easy_text_rect = easy_text.get_rect(center=easy_rect.center)
-        self.screen.blit(easy_text, easy_text_rect)
-        
-        # Medium button
-        medium_rect = pygame.Rect(self.width//2 - 75, 250, 150, 50)
-        medium_color = self.GREEN if self.selected_difficulty == 'medium' else self.DARK_GRAY
-        if medium_rect.collidepoint(mouse_pos):
-            medium_color = self.LIGHT_BLUE
-        pygame.draw.rect(self.screen, medium_color, medium_rect, border_radius=8)
-        pygame.draw.rect(self.screen, self.WHITE, medium_rect, 2, border_radius=8)
-        medium_text = self.font.render('Medium', True, self.WHITE)
-        medium_text_rect = medium_text.get_rect(center=medium_rect.center)
-        self.screen.blit(medium_text, medium_text_rect)
-        
-        # Hard button
-        hard_rect = pygame.Rect(self.width//2 + 100, 250, 150, 50)
-        hard_color = self.GREEN if self.selected_difficulty == 'hard' else self.DARK_GRAY
-        if hard_rect.collidepoint(mouse_pos):
-            hard_color = self.LIGHT_BLUE
-        pygame.draw.rect(self.screen, hard_color, hard_rect, border_radius=8)
-        pygame.draw.rect(self.screen, self.WHITE, hard_rect, 2, border_radius=8)
-        hard_text = self.font.render('Hard', True, self.WHITE)
-        hard_text_rect = hard_text.get_rect(center=hard_rect.center)
-        self.screen.blit(hard_text, hard_text_rect)
-        
-        # Back button
-        back_rect = pygame.Rect(self.width//2 - 150, 400, 300, 60)
-        back_color = self.LIGHT_BLUE if back_rect.collidepoint(mouse_pos) else self.DARK_GRAY
-        pygame.draw.rect(self.screen, back_color, back_rect, border_radius=10)
-        pygame.draw.rect(self.screen, self.WHITE, back_rect, 2, border_radius=10)
-        back_text = self.font.render('Back to Menu', True, self.WHITE)
-        back_text_rect = back_text.get_rect(center=back_rect.center)
-        self.screen.blit(back_text, back_text_rect)
+        surface.blit(difficulty_label, (self.width//2 - 250, 200))
+        
+        for name, rect, label in self._settings_buttons():
+            if name == 'back':
+                self._draw_button(surface, rect, self.DARK_GRAY, label, self.font, 10)
+            else:
+                color = self.GREEN if self.selected_difficulty == name else self.DARK_GRAY
+                self._draw_button(surface, rect, color, label, self.font, 8)
+    
+    def draw_settings(self):
+        """Draw the settings menu
         
-        pygame.display.update()
+        Like the main menu, the settings screen is cached per selected
+        difficulty and only the hovered button is drawn over it.
+        
+        Returns:
+            tuple: (action, value) where action is the selected action and value is the selected option
+        """
+        mouse_pos = self.get_mouse_pos()
+        buttons = self._settings_buttons()
+        hovered = None
+        for button in buttons:
+            if button[1].collidepoint(mouse_pos):
+                hovered = button
+                break
+        
+        frame_key = ('settings', self.selected_difficulty, hovered and hovered[0])
+        if self.compositor.needs_redraw(frame_key):
+            layer = self.compositor.layer(('settings', self.selected_difficulty),
+                                          self._build_settings)
+            self.screen.blit(layer, (0, 0))
+            if hovered is not None:
+                name, rect, label = hovered
+                self._draw_button(self.screen, rect, self.LIGHT_BLUE, label, self.font,
+                                  10 if name == 'back' else 8)
         
         # Store the button rectangles for click detection
-        self.settings_back_rect = back_rect
-        self.easy_rect = easy_rect
-        self.medium_rect = medium_rect
-        self.hard_rect = hard_rect
+        self.easy_rect, self.medium_rect, self.hard_rect, self.settings_back_rect = (
+            rect for _, rect, _ in buttons)
         
         # This return is no longer used for button detection
         # but kept for compatibility
@@ -368,9 +534,9 @@ class UI:
             bool: True if the back button is clicked
         """
         if hasattr(self, 'back_rect'):
-            return self.back_rect.collidepoint(pygame.mouse.get_pos())
+            return self.back_rect.collidepoint(self.get_mouse_pos())
         return False
-        
+    
     def set_difficulty(self, difficulty):
         """Set the AI difficulty
         
@@ -378,7 +544,7 @@ class UI:
             difficulty (str): Difficulty level ('easy', 'medium', 'hard')
         """
         self.selected_difficulty = difficulty
-        
+    
     def get_difficulty(self):
         """Get the current AI difficulty
         
@@ -393,14 +559,14 @@ class UI:
             bool: True if the settings back button is clicked
         """
         if hasattr(self, 'settings_back_rect'):
-            return self.settings_back_rect.collidepoint(pygame.mouse.get_pos())
+            return self.settings_back_rect.collidepoint(self.get_mouse_pos())
         return False
     def is_easy_button_clicked(self, mouse_pos):
         """Check if the easy button is clicked
         
         Args:
             mouse_pos: Current mouse position
-            
+        
         Returns:
             bool: True if the easy button is clicked
         """
@@ -413,7 +579,7 @@ class UI:
         
         Args:
             mouse_pos: Current mouse position
-            
+        
         Returns:
             bool: True if the medium button is clicked
         """
@@ -426,7 +592,7 @@ class UI:
         
         Args:
             mouse_pos: Current mouse position
-            
+        
         Returns:
             bool: True if the hard button is clicked
         """